@@ -1,6 +1,5 @@
 import sys
 from PySide6.QtWidgets import QApplication
-from gui.main_window import MainWindow
 
 def main():
     app = QApplication(sys.argv)
@@ -114,6 +113,9 @@ def main():
 
     app.setStyleSheet(dark_style)
     
+    # Imported after argument parsing. The modules of a benchmark run (session, benchmarks,
+    # judge cache) are only loaded when a run starts, see gui.workers and backend.startup_time
+    from gui.main_window import MainWindow
     window = MainWindow()
     
     if args.autopilot:
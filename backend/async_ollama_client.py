@@ -0,0 +1,190 @@
+import json
+import asyncio
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+from .ollama_client import (get_config, DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT,
+                            DEFAULT_MAX_RETRIES, DEFAULT_RETRY_BACKOFF, DEFAULT_POOL_SIZE, RETRY_STATUS_CODES)
+
+class AsyncOllamaClient:
+    """
+    Asyncio counterpart of OllamaClient with the same surface.
+    At most `max_concurrency` requests are in flight at once, which should match
+    the OLLAMA_NUM_PARALLEL setting of the server.
+
+    The underlying HTTP client is bound to the event loop it was first used in,
+    so use one instance per asyncio.run():
+
+        async with AsyncOllamaClient(max_concurrency=4) as client:
+            results = await asyncio.gather(*(client.generate(m, p) for p in prompts))
+    """
+
+    def __init__(self, base_url=None, max_concurrency=None, connect_timeout=None,
+                 read_timeout=None, max_retries=None):
+        if httpx is None:
+            raise RuntimeError("AsyncOllamaClient requires the 'httpx' package (pip install httpx)")
+
+        config = get_config()
+        if base_url:
+            self.base_url = base_url
+        else:
+            self.base_url = config.get("ollama_api_url", "http://localhost:11434/api")
+
+        self.max_concurrency = int(max_concurrency or config.get("max_concurrency") or DEFAULT_POOL_SIZE)
+        self.connect_timeout = float(connect_timeout or config.get("connect_timeout") or DEFAULT_CONNECT_TIMEOUT)
+        self.read_timeout = float(read_timeout or config.get("read_timeout") or DEFAULT_READ_TIMEOUT)
+        if max_retries is None:
+            max_retries = config.get("max_retries", DEFAULT_MAX_RETRIES)
+        self.max_retries = int(max_retries)
+
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._http = None
+
+    def _client(self):
+        if self._http is None:
+            # The transport retries connection errors (without backoff), _send adds the
+            # 502/503/504 retries with backoff, together the policy of OllamaClient
+            transport = httpx.AsyncHTTPTransport(retries=self.max_retries)
+            self._http = httpx.AsyncClient(
+                transport=transport,
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(max_connections=self.max_concurrency,
+                                    max_keepalive_connections=self.max_concurrency),
+            )
+        return self._http
+
+    async def _send(self, method, url, stream=False, **kwargs):
+        """Sends a request, retrying 502/503/504 with exponential backoff like OllamaClient"""
+        client = self._client()
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                await asyncio.sleep(DEFAULT_RETRY_BACKOFF * 2 ** (attempt - 1))
+            response = await client.send(client.build_request(method, url, **kwargs), stream=stream)
+            if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                return response
+            await response.aclose()
+
+    async def aclose(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def list_models(self):
+        try:
+            response = await self._send("GET", f"{self.base_url}/tags")
+            response.raise_for_status()
+            models = response.json().get('models', [])
+            return [m['name'] for m in models]
+        except Exception as e:
+            print(f"Error listing models: {e}")
+            return []
+
+    async def check_model_availability(self, model_name):
+        models = await self.list_models()
+        return model_name in models
+
+    async def generate(self, model, prompt, system=None, options=None, stream=False, format=None):
+        """
+        Generates text. Returns dict with 'response', 'total_duration', 'eval_count', 'eval_duration' etc.
+        If stream=True, returns an async iterator over the response chunks (see generate_stream).
+        format can be "json" or a JSON schema dict to constrain the output.
+        """
+        if stream:
+            return self.generate_stream(model, prompt, system=system, options=options, format=format)
+
+        payload = self._build_payload(model, prompt, system, options, stream=False, format=format)
+        try:
+            async with self._semaphore:
+                response = await self._send("POST", f"{self.base_url}/generate", json=payload)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            return {"error": str(e)}
+
+    async def generate_stream(self, model, prompt, system=None, options=None, format=None):
+        """
+        Async generator over NDJSON chunks. The concurrency slot is held until the
+        stream is exhausted or closed.
+        """
+        payload = self._build_payload(model, prompt, system, options, stream=True, format=format)
+        try:
+            async with self._semaphore:
+                r = await self._send("POST", f"{self.base_url}/generate", stream=True, json=payload)
+                try:
+                    r.raise_for_status()
+                    async for line in r.aiter_lines():
+                        if line:
+                            yield json.loads(line)
+                finally:
+                    await r.aclose()
+        except Exception as e:
+            yield {"error": str(e)}
+
+    def _build_payload(self, model, prompt, system, options, stream, format=None):
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": stream,
+        }
+        if system:
+            payload["system"] = system
+        if options:
+            payload["options"] = options
+        if format:
+            payload["format"] = format
+        return payload
+
+    async def show_model_info(self, model_name):
+        """
+        Returns model details (quantization, context length, etc.)
+        """
+        try:
+            response = await self._send("POST", f"{self.base_url}/show", json={"name": model_name})
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            print(f"Error showing model info: {e}")
+            return {}
+
+    async def pull_model(self, model_name, progress_callback=None):
+        """
+        Pulls a model. progress_callback receives the progress dicts.
+        """
+        payload = {"name": model_name, "stream": True}
+        try:
+            async with self._client().stream("POST", f"{self.base_url}/pull", json=payload) as r:
+                r.raise_for_status()
+                async for line in r.aiter_lines():
+                    if line:
+                        try:
+                            data = json.loads(line)
+                            if progress_callback:
+                                progress_callback(data)
+                        except:
+                            pass
+            return True
+        except Exception as e:
+            print(f"Pull error: {e}")
+            if progress_callback:
+                progress_callback({"error": str(e)})
+            return False
+
+    async def delete_model(self, model_name):
+        """
+        Deletes a model from Ollama.
+        """
+        try:
+            response = await self._client().request("DELETE", f"{self.base_url}/delete", json={"name": model_name})
+            return response.status_code == 200
+        except Exception as e:
+            print(f"Delete error: {e}")
+            return False
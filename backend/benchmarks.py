@@ -5,24 +5,231 @@ Verbesserte 1-10 Punkte Benchmark-Suite für Ollama-Modelle
 
 import time
 import json
-import re
-from .ollama_client import OllamaClient
+import random
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from .ollama_client import OllamaClient, get_config
+from .stats import summarize, relative_ci_half_width, percentile, StreamTimer
 
 JUDGE_MODEL = "qwen2.5:14b-instruct"
-JUDGE_OPTIONS = {"temperature": 0.0, "top_p": 1.0}
+# num_predict caps runaway judges, the stop sequence catches endless whitespace after the
+# JSON (raw newlines can only appear between JSON tokens, never inside strings)
+JUDGE_OPTIONS = {"temperature": 0.0, "top_p": 1.0, "num_predict": 512, "stop": ["\n\n\n\n"]}
+
+# Structured output: Ollama constrains the judge to this JSON schema ("format" parameter)
+JUDGE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "score": {"type": "integer", "minimum": 1, "maximum": 10},
+        "issues": {"type": "array", "items": {"type": "string"}, "maxItems": 10},
+        "comment": {"type": "string", "maxLength": 300}
+    },
+    "required": ["score", "issues", "comment"]
+}
+JUDGE_MAX_ATTEMPTS = 3  # judge calls per answer before giving up on a parseable verdict
+# A greedy judge repeats a broken verdict exactly, so parse failures are retried sampled
+# (own seed per attempt) and with a larger token budget
+JUDGE_RETRY_TEMPERATURE = 0.3
+
+# Speed benchmark (A): measured repetitions after the warmup
+SPEED_SAMPLES = 5
+SPEED_MAX_SAMPLES = 20  # upper bound when adaptive stopping (speed_ci_target) is enabled
+# Fixed-length decode: every sample generates exactly this many tokens (0 = let the model stop)
+SPEED_NUM_PREDICT = 256
+SPEED_MAX_CONTINUATIONS = 4  # follow-up requests when a model stops before SPEED_NUM_PREDICT
+SPEED_CONTINUE_PROMPT = "Continue."
+# Prompt variants (config speed_prompts), the first one gives the score.
+# The other ones show how the tokenizer handles different kinds of text.
+SPEED_PROMPTS = {
+    "numbers": "Write the numbers from one to one thousand in English words without explanations.",
+    "prose": "Write a long short story about a lighthouse keeper who finds a message in a bottle.",
+    "code": "Write a complete Python module that implements a command line todo list manager with "
+             "JSON storage, argument parsing and unit tests.",
+    "german": "Schreibe einen ausführlichen Aufsatz über die Geschichte der Eisenbahn in Deutschland.",
+}
+SPEED_DEFAULT_PROMPTS = ["numbers"]
+
+# Context sweep (L): prompt sizes in tokens, capped at the model's context_length
+CONTEXT_SWEEP_SIZES = [1024, 4096, 8192, 16384, 32768]
+CONTEXT_SWEEP_DECODE_TOKENS = 64   # tokens generated per point (decode TPS at that context)
+CONTEXT_SWEEP_MARGIN = 256         # headroom for the prompt template and tokenizer drift
+CONTEXT_CHARS_PER_TOKEN = 4.0      # first guess, recalibrated from prompt_eval_count
+
+CONTEXT_FILLER_SENTENCES = [
+    "The quarterly logistics review covered warehouse throughput, carrier delays and seasonal staffing.",
+    "Several teams reported that the new inventory scanner reduced manual counting errors.",
+    "A supplier in the northern region announced a price adjustment for packaging materials.",
+    "The maintenance schedule for the conveyor belts was moved from Tuesday to Thursday nights.",
+    "Customer feedback highlighted faster delivery times but mentioned damaged boxes in rare cases.",
+    "Finance asked all departments to submit travel expenses before the end of the month.",
+    "The training session on forklift safety was attended by forty-two employees.",
+    "Energy consumption in the main hall dropped after the lighting was replaced with LEDs.",
+    "A pilot project tested reusable crates for shipments between the two largest sites.",
+    "The IT department plans to migrate the order database during the next holiday weekend.",
+]
+
+# Concurrency benchmark (P): simultaneous requests per level
+CONCURRENCY_LEVELS = [1, 2, 4, 8, 16]
+CONCURRENCY_NUM_PREDICT = 128
+CONCURRENCY_SATURATION_GAIN = 1.10  # a level must add >10% aggregate throughput to count as scaling
+CONCURRENCY_PROMPT = "Explain in a few paragraphs how a refrigerator works."
+
+# Cold start benchmark (S): unload/load cycles
+COLD_START_RUNS = 3
+COLD_START_SETTLE_S = 1.0  # give the server time to free the memory after unloading
+
+# Soak test (T): continuous generation, throughput per window
+SOAK_DURATION_S = 300
+SOAK_WINDOW_S = 15
+SOAK_NUM_PREDICT = 1024
+SOAK_STEADY_WINDOWS = 3  # steady state = mean of the last N windows
+SOAK_PROMPT = ("Write a long, detailed history of the printing press, from its invention "
+               "to modern digital printing. Do not stop early.")
+
+# Optional performance benchmarks, run after A when their config key is set
+PERFORMANCE_BENCHMARKS = [
+    ("L", "context_sweep"),
+    ("P", "concurrency_benchmark"),
+    ("S", "cold_start_benchmark"),
+    ("T", "soak_benchmark"),
+]
+
+def enabled_performance_benchmarks(config):
+    return [bench_id for bench_id, key in PERFORMANCE_BENCHMARKS if config.get(key)]
+
+def context_length_from_info(model_info):
+    """Reads the trained context length from show_model_info (key depends on the architecture)"""
+    m_info = model_info.get("model_info", {}) if isinstance(model_info, dict) else {}
+    if not isinstance(m_info, dict):
+        return None
+    for key, value in m_info.items():
+        if key.endswith(".context_length") and isinstance(value, int):
+            return value
+    return None
+
+def timing_breakdown(res, wall_s=None):
+    """
+    Splits Ollama's timing fields (nanoseconds) into prompt processing (prefill),
+    decode, model load and harness overhead (wall clock minus total_duration).
+    Works for non-streamed responses and for the final chunk of a stream.
+    """
+    ns = 1_000_000_000
+    prompt_tokens = res.get("prompt_eval_count") or 0
+    prompt_ns = res.get("prompt_eval_duration") or 0
+    eval_tokens = res.get("eval_count") or 0
+    eval_ns = res.get("eval_duration") or 0
+    load_ns = res.get("load_duration") or 0
+    total_ns = res.get("total_duration") or 0
+
+    timing = {
+        "prompt_tokens": prompt_tokens,
+        "prefill_time_s": round(prompt_ns / ns, 3),
+        # Ollama omits prompt_eval_* when the prompt came from its cache
+        "prefill_tps": round(prompt_tokens / prompt_ns * ns, 2) if prompt_ns else None,
+        "decode_tokens": eval_tokens,
+        "decode_time_s": round(eval_ns / ns, 3),
+        "decode_tps": round(eval_tokens / eval_ns * ns, 2) if eval_ns else None,
+        "load_time_s": round(load_ns / ns, 3),
+        "server_total_s": round(total_ns / ns, 3),
+    }
+    if wall_s is not None:
+        timing["wall_time_s"] = round(wall_s, 3)
+        timing["harness_overhead_s"] = round(wall_s - total_ns / ns, 3) if total_ns else None
+    return timing
+
+class JsonObjectScanner:
+    """
+    Tracks brace depth over streamed text (aware of strings and escapes) and
+    reports when the first top-level JSON object is closed.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.start = -1
+        self.end = -1
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk):
+        """Returns True as soon as the top-level object is complete"""
+        offset = len(self.text)
+        self.text += chunk
+        if self.end >= 0:
+            return True
+
+        for i, ch in enumerate(chunk, offset):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                if self.start >= 0:
+                    self._in_string = True
+            elif ch == "{":
+                if self.start < 0:
+                    self.start = i
+                self._depth += 1
+            elif ch == "}" and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 0:
+                    self.end = i
+                    return True
+        return False
+
+    @property
+    def complete(self):
+        return self.end >= 0
+
+    def object_text(self):
+        """The complete object, or everything received so far if it never closed"""
+        if self.complete:
+            return self.text[self.start:self.end + 1]
+        return self.text
+
+class JudgeCallError(RuntimeError):
+    """The judge request itself failed (connection, HTTP error), not the verdict"""
 
 class BenchmarkRunner:
-    def __init__(self, client: OllamaClient):
+    def __init__(self, client: OllamaClient, judge_cache=None, store_generations=False):
         self.client = client
+        # Optional JudgeCache (backend/judge_cache.py), None = always ask the judge
+        self.judge_cache = judge_cache
+        # Keep the raw model answer in every task result so it can be re-judged later (backend/rejudge.py)
+        self.store_generations = store_generations
 
     # -------------------- PUBLIC --------------------
 
-    def run_benchmark(self, bench_id: str, test_model: str, options=None, progress_callback=None):
+    def run_benchmark(self, bench_id: str, test_model: str, options=None, progress_callback=None, monitor_factory=None):
+        """
+        monitor_factory is only used by the performance benchmarks that report VRAM per
+        measurement point (see run_context_sweep).
+        """
         bench_id = bench_id.upper()
         
         # Speed Test bleibt gleich
         if bench_id == "A":
-            return self._run_speed(test_model, options=options, progress_callback=progress_callback)
+            return self.run_speed(test_model, options=options, progress_callback=progress_callback)
+        
+        # Context-Sweep (Prefill-Skalierung)
+        elif bench_id == "L":
+            return self.run_context_sweep(test_model, options=options, progress_callback=progress_callback,
+                                          monitor_factory=monitor_factory)
+        
+        # Parallele Requests (Durchsatz unter Last)
+        elif bench_id == "P":
+            return self.run_concurrency(test_model, options=options, progress_callback=progress_callback)
+        
+        # Kaltstart (Ladezeit des Modells)
+        elif bench_id == "S":
+            return self.run_cold_start(test_model, options=options, progress_callback=progress_callback)
+        
+        # Dauerlast (thermisches Throttling)
+        elif bench_id == "T":
+            return self.run_soak(test_model, options=options, progress_callback=progress_callback)
         
         # Kategorie-Tests (mehrere Tasks pro Kategorie)
         elif bench_id in ["B1", "B2", "B3"]:
@@ -93,7 +300,7 @@ class BenchmarkRunner:
         category_id = category_id.upper()
         
         if category_id == "A":
-            return self._run_speed(test_model, options=options, progress_callback=progress_callback)
+            return self.run_speed(test_model, options=options, progress_callback=progress_callback)
         
         # Tasks der Kategorie bestimmen
         if category_id == "B":
@@ -195,39 +402,638 @@ class BenchmarkRunner:
         return self.run_category(category_id, test_model, options, progress_callback)
 
     # -------------------- SPEED --------------------
-    # UNVERÄNDERT von deiner Version
 
-    def _run_speed(self, test_model, options=None, progress_callback=None):
+    def _speed_sample(self, test_model, prompt, options=None, num_predict=0):
+        """
+        Eine Speed-Messung. Mit num_predict wird genau so lange generiert: hört das Modell
+        früher auf, wird die Antwort über den zurückgegebenen context fortgesetzt.
+        Returns (tps, tokens, wall time, merged response, number of requests).
+        """
+        req_options = dict(options or {})
+        if num_predict:
+            req_options["num_predict"] = num_predict
+
+        start_t = time.time()
+        res = self.client.generate(test_model, prompt, options=req_options, stream=False)
+        merged = dict(res)
+        segments = 1
+        while (num_predict and "error" not in res and segments <= SPEED_MAX_CONTINUATIONS
+               and res.get("context") and (merged.get("eval_count") or 0) < num_predict):
+            req_options["num_predict"] = num_predict - merged.get("eval_count", 0)
+            res = self.client.generate(test_model, SPEED_CONTINUE_PROMPT, options=req_options,
+                                       stream=False, context=res["context"])
+            if "error" in res:
+                break
+            segments += 1
+            # Prefill stays the one of the original prompt, decode and load add up
+            for key in ("eval_count", "eval_duration", "load_duration", "total_duration"):
+                merged[key] = (merged.get(key) or 0) + (res.get(key) or 0)
+            merged["response"] = (merged.get("response") or "") + (res.get("response") or "")
+            merged["done_reason"] = res.get("done_reason")
+        elapsed = max(time.time() - start_t, 1e-9)
+        merged.pop("context", None)
+
+        eval_count = merged.get("eval_count") or merged.get("tokens") or len((merged.get("response") or "").split())
+        eval_duration_ns = merged.get("eval_duration", 0)
+        tps = (eval_count / eval_duration_ns) * 1_000_000_000 if eval_duration_ns else eval_count / elapsed
+        return tps, int(eval_count), elapsed, merged, segments
+
+    def run_speed(self, test_model, options=None, progress_callback=None, samples=None, max_samples=None, ci_target=None,
+                  num_predict=None, prompts=None):
+        """
+        Misst Decode-TPS über mehrere Wiederholungen.
+        samples: feste Anzahl Messungen (config: speed_samples).
+        ci_target: optionales adaptives Stoppen, sobald die relative Halbbreite des
+        Konfidenzintervalls darunter liegt (z.B. 0.03 = +-3%), höchstens max_samples Messungen.
+        num_predict: feste Decode-Länge pro Messung (config: speed_num_predict, 0 = Modell entscheidet).
+        prompts: Prompt-Varianten aus SPEED_PROMPTS (config: speed_prompts), die erste ergibt den Score.
+        """
+        config = get_config()
+        samples = max(1, int(samples or config.get("speed_samples") or SPEED_SAMPLES))
+        if ci_target is None:
+            ci_target = config.get("speed_ci_target")
+        max_samples = max(samples, int(max_samples or config.get("speed_max_samples") or SPEED_MAX_SAMPLES)) if ci_target else samples
+        if num_predict is None:
+            num_predict = config.get("speed_num_predict", SPEED_NUM_PREDICT)
+        num_predict = int(num_predict or 0)
+        prompts = [p for p in (prompts or config.get("speed_prompts") or SPEED_DEFAULT_PROMPTS) if p in SPEED_PROMPTS]
+        if not prompts:
+            prompts = list(SPEED_DEFAULT_PROMPTS)
+
         if progress_callback:
             progress_callback("Warmup (speed)...")
 
-        prompt = "Write the numbers from one to one thousand in English words without explanations."
-
-        # Warmup
+        # Warmup (its load time is the closest thing to a cold load we see here)
+        warmup_timing = {}
         try:
-            _ = self.client.generate(test_model, prompt, options=options, stream=False)
+            start_t = time.time()
+            warmup_options = dict(options or {})
+            if num_predict:
+                warmup_options["num_predict"] = num_predict
+            warmup = self.client.generate(test_model, SPEED_PROMPTS[prompts[0]], options=warmup_options, stream=False)
+            warmup_timing = timing_breakdown(warmup, time.time() - start_t)
         except Exception:
             pass
 
-        if progress_callback:
-            progress_callback("Measuring speed...")
+        variants = {}
+        for variant in prompts:
+            tps_values = []
+            token_counts = []
+            wall_times = []
+            timings = []
+            chars = 0
+            continuations = 0
+            adaptive_stop = False
+            while len(tps_values) < max_samples:
+                if progress_callback:
+                    label = f"{variant}, " if len(prompts) > 1 else ""
+                    progress_callback(f"Measuring speed ({label}sample {len(tps_values) + 1})...")
 
-        start_t = time.time()
-        res = self.client.generate(test_model, prompt, options=options, stream=False)
-        end_t = time.time()
-        elapsed = max(end_t - start_t, 1e-9)
+                tps, eval_count, elapsed, res, segments = self._speed_sample(
+                    test_model, SPEED_PROMPTS[variant], options=options, num_predict=num_predict)
 
-        eval_count = res.get("eval_count") or res.get("tokens") or len((res.get("response") or "").split())
-        eval_duration_ns = res.get("eval_duration", 0)
-        tps = (eval_count / eval_duration_ns) * 1_000_000_000 if eval_duration_ns else eval_count / elapsed
+                tps_values.append(tps)
+                token_counts.append(eval_count)
+                wall_times.append(elapsed)
+                timings.append(timing_breakdown(res, elapsed))
+                chars += len(res.get("response") or "")
+                continuations += segments - 1
+
+                if len(tps_values) >= samples:
+                    if not ci_target:
+                        break
+                    if relative_ci_half_width(tps_values) <= float(ci_target):
+                        adaptive_stop = True
+                        break
+
+            variants[variant] = {
+                "tps_values": tps_values,
+                "token_counts": token_counts,
+                "wall_times": wall_times,
+                "timings": timings,
+                "tps_stats": summarize(tps_values),
+                "adaptive_stop": adaptive_stop,
+                "continuations": continuations,
+                # Tokenizer efficiency: more characters per token = fewer tokens for the same text
+                "chars_per_token": round(chars / sum(token_counts), 2) if sum(token_counts) else None,
+            }
+
+        main = variants[prompts[0]]
+        tps_values = main["tps_values"]
+        token_counts = main["token_counts"]
+        timings = main["timings"]
+        tps_stats = main["tps_stats"]
+        tps = tps_stats["median"]
+
+        def median_of(key):
+            values = [t[key] for t in timings if t.get(key) is not None]
+            return round(statistics.median(values), 3) if values else None
+
+        details = {
+            "tokens": int(statistics.median(token_counts)),
+            "total_time_s": round(statistics.median(main["wall_times"]), 3),
+            "tokens_per_sec": round(tps, 2),
+            "samples": len(tps_values),
+            "samples_tps": [round(v, 2) for v in tps_values],
+            "tps_stats": tps_stats,
+            "ci_target": ci_target,
+            "adaptive_stop": main["adaptive_stop"],
+            "num_predict": num_predict,
+            "prompt_variant": prompts[0],
+            "continuations": main["continuations"],
+            "chars_per_token": main["chars_per_token"],
+            "prefill_tps": median_of("prefill_tps"),
+            "decode_tps": median_of("decode_tps"),
+            "load_time_s": median_of("load_time_s"),
+            "harness_overhead_s": median_of("harness_overhead_s"),
+            "warmup_load_time_s": warmup_timing.get("load_time_s"),
+            "timings": timings
+        }
+        if len(prompts) > 1:
+            details["variants"] = {
+                name: {
+                    "tokens_per_sec": v["tps_stats"]["median"],
+                    "tps_stats": v["tps_stats"],
+                    "tokens": int(statistics.median(v["token_counts"])),
+                    "chars_per_token": v["chars_per_token"],
+                    "continuations": v["continuations"]
+                }
+                for name, v in variants.items()
+            }
 
         return {
             "id": "A",
             "name": "Velocity/Speed",
             "description": "Velocity/Speed",
-            "score": round(tps, 2), # TPS is the "score" now
-            "comment": f"{round(tps,2)} tokens/sec",
-            "details": {"tokens": int(eval_count), "total_time_s": round(elapsed, 3), "tokens_per_sec": round(tps, 2)}
+            "unit": "t/s",
+            "score": round(tps, 2), # TPS is the "score" now (median over all samples)
+            "comment": f"{round(tps,2)} tokens/sec (median of {len(tps_values)}, 95% CI {tps_stats['ci_low']}-{tps_stats['ci_high']})",
+            "details": details
+        }
+
+    # -------------------- CONTEXT SWEEP --------------------
+
+    def context_sweep_sizes(self, max_context=None):
+        """Kontextgrößen bis einschließlich der context_length des Modells"""
+        if not max_context:
+            return list(CONTEXT_SWEEP_SIZES)
+        return [size for size in CONTEXT_SWEEP_SIZES if size <= int(max_context)]
+
+    def context_prompt_tokens(self, size, max_context=None):
+        """
+        Prompt-Größe für einen Messpunkt. At the top of the model's context the prompt
+        is shortened, so decode budget and margin still fit into max_context.
+        """
+        if max_context and size + CONTEXT_SWEEP_DECODE_TOKENS + CONTEXT_SWEEP_MARGIN > int(max_context):
+            return int(max_context) - CONTEXT_SWEEP_DECODE_TOKENS - CONTEXT_SWEEP_MARGIN
+        return size
+
+    def _build_context_prompt(self, target_tokens, chars_per_token=CONTEXT_CHARS_PER_TOKEN):
+        """
+        Synthetischer Prompt mit ca. target_tokens Tokens und einem Codewort in der Mitte.
+        The header differs per size, so Ollama cannot reuse the cached prefix of the
+        previous (smaller) prompt and really processes the whole prompt.
+        """
+        rng = random.Random(target_tokens)
+        code_word = f"ORCHID-{rng.randint(1000, 9999)}"
+        question = ("\n\nQuestion: What is the code word mentioned in the document above? "
+                    "Answer with the code word only.")
+        header = f"Internal document #{target_tokens}-{rng.randint(100000, 999999)}. Read it carefully.\n\n"
+
+        target_chars = int(target_tokens * chars_per_token) - len(header) - len(question)
+        paragraphs = []
+        length = 0
+        index = 1
+        while length < target_chars:
+            sentences = rng.sample(CONTEXT_FILLER_SENTENCES, 4)
+            paragraph = f"Paragraph {index}: " + " ".join(sentences)
+            paragraphs.append(paragraph)
+            length += len(paragraph) + 2
+            index += 1
+
+        middle = len(paragraphs) // 2
+        paragraphs.insert(middle, f"Paragraph {middle + 1}b: Note for the reader, the code word is {code_word}.")
+        return header + "\n\n".join(paragraphs) + question, code_word
+
+    def run_context_point(self, test_model, target_tokens, options=None, chars_per_token=CONTEXT_CHARS_PER_TOKEN,
+                          num_ctx=None):
+        """Misst Prefill-TPS, TTFT und Decode-TPS für eine Prompt-Größe"""
+        prompt, code_word = self._build_context_prompt(target_tokens, chars_per_token)
+        point_options = dict(options or {})
+        point_options["num_ctx"] = num_ctx or target_tokens + CONTEXT_SWEEP_DECODE_TOKENS + CONTEXT_SWEEP_MARGIN
+        point_options["num_predict"] = CONTEXT_SWEEP_DECODE_TOKENS
+
+        # Load the model with this num_ctx first, otherwise the reload ends up in the TTFT
+        self.client.generate(test_model, "Hi", options=dict(point_options, num_predict=1), stream=False)
+
+        timer = StreamTimer()
+        start_t = time.time()
+        answer = ""
+        final_chunk = {}
+        error = None
+        for chunk in self.client.generate(test_model, prompt, options=point_options, stream=True):
+            if "error" in chunk:
+                error = chunk["error"]
+                break
+            text = chunk.get("response", "")
+            if text:
+                timer.mark()
+            answer += text
+            if chunk.get("done"):
+                final_chunk = chunk
+                break
+        elapsed = time.time() - start_t
+
+        point = {"target_tokens": target_tokens, "num_ctx": point_options["num_ctx"]}
+        if error:
+            point["error"] = error
+            return point
+
+        timing = timing_breakdown(final_chunk, elapsed)
+        latency = timer.summary()
+        prompt_tokens = timing["prompt_tokens"]
+        point.update({
+            "prompt_tokens": prompt_tokens,
+            "prefill_tps": timing["prefill_tps"],
+            "prefill_time_s": timing["prefill_time_s"],
+            "ttft_ms": latency["ttft_ms"],
+            "decode_tps": timing["decode_tps"],
+            "itl_p99_ms": latency.get("itl_p99_ms"),
+            "needle_found": code_word in answer,
+            # Measured ratio, used to size the next prompt more precisely
+            "chars_per_token": round(len(prompt) / prompt_tokens, 3) if prompt_tokens else chars_per_token
+        })
+        return point
+
+    def run_context_sweep(self, test_model, options=None, progress_callback=None, max_context=None, monitor_factory=None):
+        """
+        Context-Sweep: 1k bis 32k Tokens bis zur context_length des Modells.
+        monitor_factory: optional, creates an object with start()/stop()/peak_vram
+        (e.g. backend.telemetry.TelemetrySampler.window) that is run around every point.
+        """
+        if max_context is None:
+            max_context = context_length_from_info(self.client.show_model_info(test_model))
+
+        points = []
+        chars_per_token = CONTEXT_CHARS_PER_TOKEN
+        for size in self.context_sweep_sizes(max_context):
+            if progress_callback:
+                progress_callback(f"Context sweep: {size} tokens...")
+
+            monitor = monitor_factory() if monitor_factory else None
+            if monitor:
+                monitor.start()
+            prompt_tokens = self.context_prompt_tokens(size, max_context)
+            try:
+                point = self.run_context_point(test_model, prompt_tokens, options=options, chars_per_token=chars_per_token,
+                                               num_ctx=size if prompt_tokens < size else None)
+            finally:
+                if monitor:
+                    monitor.stop()
+            if monitor:
+                point["peak_vram_mb"] = monitor.peak_vram
+            point["context_size"] = size
+
+            points.append(point)
+            if "error" in point:
+                # Larger prompts will fail the same way (usually out of memory)
+                break
+            chars_per_token = point.get("chars_per_token", chars_per_token)
+
+        return self.compile_context_sweep(points, max_context)
+
+    def compile_context_sweep(self, points, max_context=None):
+        """Erstellt das Ergebnis (Kurve) aus den einzelnen Messpunkten"""
+        ok = [p for p in points if "error" not in p]
+        largest = ok[-1] if ok else {}
+        score = largest.get("prefill_tps") or 0
+
+        if largest:
+            comment = (f"{score} prefill t/s at {largest.get('prompt_tokens')} tokens, "
+                       f"TTFT {largest.get('ttft_ms')} ms")
+            if largest.get("target_tokens", 0) < largest.get("context_size", 0):
+                comment += (f" (full {largest['context_size']} context, prompt shortened to leave room "
+                            f"for {CONTEXT_SWEEP_DECODE_TOKENS} decode tokens)")
+        else:
+            comment = "Error: " + (points[0].get("error", "no context size fits") if points else "no context size fits")
+
+        return {
+            "id": "L",
+            "name": "Context Scaling",
+            "description": "Prefill scaling over prompt length",
+            "unit": "t/s",
+            "score": score,
+            "comment": comment,
+            "details": {
+                "max_context": max_context,
+                "points": points,
+                "curve": {
+                    "prompt_tokens": [p.get("prompt_tokens") for p in ok],
+                    "prefill_tps": [p.get("prefill_tps") for p in ok],
+                    "ttft_ms": [p.get("ttft_ms") for p in ok],
+                    "decode_tps": [p.get("decode_tps") for p in ok],
+                    "peak_vram_mb": [p.get("peak_vram_mb") for p in ok]
+                }
+            }
+        }
+
+    # -------------------- CONCURRENCY --------------------
+
+    def _timed_stream(self, client, test_model, prompt, options):
+        """Ein gestreamter Request mit TTFT und Ollama-Timings (läuft in einem Worker-Thread)"""
+        timer = StreamTimer()
+        start_t = time.time()
+        final_chunk = {}
+        for chunk in client.generate(test_model, prompt, options=options, stream=True):
+            if "error" in chunk:
+                return {"error": chunk["error"]}
+            if chunk.get("response"):
+                timer.mark()
+            if chunk.get("done"):
+                final_chunk = chunk
+                break
+        result = timing_breakdown(final_chunk, time.time() - start_t)
+        result["ttft_ms"] = timer.summary()["ttft_ms"]
+        result["end"] = time.time()
+        return result
+
+    def run_concurrency(self, test_model, options=None, progress_callback=None, levels=None):
+        """
+        Feuert 1, 2, 4, 8, 16 gleichzeitige Requests ab und misst den Gesamtdurchsatz.
+        The server only runs requests in parallel up to OLLAMA_NUM_PARALLEL, the rest
+        is queued, which shows up as rising TTFT and a flat aggregate throughput.
+        """
+        levels = levels or get_config().get("concurrency_levels") or CONCURRENCY_LEVELS
+        req_options = dict(options or {})
+        req_options["num_predict"] = CONCURRENCY_NUM_PREDICT
+
+        # Own client with a connection pool large enough for the highest level
+        client = OllamaClient(base_url=self.client.base_url, pool_size=max(levels))
+
+        if progress_callback:
+            progress_callback("Warmup (concurrency)...")
+        client.generate(test_model, CONCURRENCY_PROMPT, options=req_options, stream=False)
+
+        results = []
+        try:
+            for level in levels:
+                if progress_callback:
+                    progress_callback(f"{level} parallel requests...")
+
+                start_t = time.time()
+                with ThreadPoolExecutor(max_workers=level) as pool:
+                    futures = [pool.submit(self._timed_stream, client, test_model, CONCURRENCY_PROMPT, req_options)
+                               for _ in range(level)]
+                    runs = [f.result() for f in futures]
+
+                ok = [r for r in runs if "error" not in r]
+                wall = max([r["end"] for r in ok], default=time.time()) - start_t
+                tokens = sum(r.get("decode_tokens", 0) for r in ok)
+                per_request = [r["decode_tps"] for r in ok if r.get("decode_tps")]
+                ttfts = [r["ttft_ms"] for r in ok if r.get("ttft_ms") is not None]
+
+                results.append({
+                    "concurrency": level,
+                    "aggregate_tps": round(tokens / wall, 2) if wall > 0 else 0,
+                    "wall_time_s": round(wall, 3),
+                    "total_tokens": tokens,
+                    "per_request_tps": summarize(per_request),
+                    "ttft_ms": {
+                        "p50": round(percentile(ttfts, 50), 1),
+                        "p90": round(percentile(ttfts, 90), 1),
+                        "p99": round(percentile(ttfts, 99), 1),
+                        "max": round(max(ttfts), 1) if ttfts else None
+                    },
+                    "errors": [r["error"] for r in runs if "error" in r]
+                })
+                if not ok:
+                    break
+        finally:
+            client.close()
+
+        return self.compile_concurrency(results)
+
+    def compile_concurrency(self, levels):
+        """Gesamtergebnis inkl. Sättigungspunkt (ab dem mehr Parallelität kaum noch Durchsatz bringt)"""
+        saturation = None
+        for prev, cur in zip(levels, levels[1:]):
+            if cur["aggregate_tps"] < prev["aggregate_tps"] * CONCURRENCY_SATURATION_GAIN:
+                saturation = prev["concurrency"]
+                break
+
+        best = max(levels, key=lambda l: l["aggregate_tps"], default={})
+        score = best.get("aggregate_tps", 0)
+        if best:
+            comment = f"Peak {score} t/s aggregate at {best['concurrency']} parallel requests"
+            if saturation:
+                comment += f", saturates at {saturation}"
+        else:
+            comment = "Error: no successful requests"
+
+        return {
+            "id": "P",
+            "name": "Parallel Throughput",
+            "description": "Aggregate throughput at increasing parallel request counts",
+            "unit": "t/s",
+            "score": score,
+            "comment": comment,
+            "details": {
+                "levels": levels,
+                "saturation_concurrency": saturation,
+                "num_predict": CONCURRENCY_NUM_PREDICT
+            }
+        }
+
+    # -------------------- COLD START --------------------
+
+    def _minimal_generate(self, test_model, options):
+        """Kleinstmöglicher Request: ein Token, gestreamt für die TTFT"""
+        timer = StreamTimer()
+        start_t = time.time()
+        final_chunk = {}
+        for chunk in self.client.generate(test_model, "Hi", options=options, stream=True):
+            if "error" in chunk:
+                return {"error": chunk["error"]}
+            if chunk.get("response"):
+                timer.mark()
+            if chunk.get("done"):
+                final_chunk = chunk
+                break
+        result = timing_breakdown(final_chunk, time.time() - start_t)
+        result["ttft_ms"] = timer.summary()["ttft_ms"]
+        return result
+
+    def run_cold_start(self, test_model, options=None, progress_callback=None, runs=None):
+        """
+        Entlädt das Modell und misst danach die Ladezeit (mehrfach).
+        Note: after the first run the model files are usually in the OS page cache, so
+        later runs measure a load from RAM rather than from disk. Both are reported.
+        """
+        runs = max(1, int(runs or get_config().get("cold_start_runs") or COLD_START_RUNS))
+        req_options = dict(options or {})
+        req_options["num_predict"] = 1
+
+        size_bytes = self.client.get_model_size(test_model)
+        size_mb = round(size_bytes / 1024 / 1024, 2) if size_bytes else None
+
+        samples = []
+        for i in range(runs):
+            if progress_callback:
+                progress_callback(f"Cold start {i + 1}/{runs}: unloading...")
+            self.client.unload_model(test_model)
+            time.sleep(COLD_START_SETTLE_S)
+
+            if progress_callback:
+                progress_callback(f"Cold start {i + 1}/{runs}: loading...")
+            cold = self._minimal_generate(test_model, req_options)
+            if "error" in cold:
+                samples.append({"run": i + 1, "error": cold["error"]})
+                break
+            warm = self._minimal_generate(test_model, req_options)
+
+            load_s = cold["load_time_s"]
+            samples.append({
+                "run": i + 1,
+                "cold_load_s": load_s,
+                "cold_wall_s": cold["wall_time_s"],
+                "cold_ttft_ms": cold["ttft_ms"],
+                "warm_ttft_ms": warm.get("ttft_ms"),
+                "warm_load_s": warm.get("load_time_s"),
+                "load_mb_per_s": round(size_mb / load_s, 1) if size_mb and load_s else None
+            })
+
+        ok = [s for s in samples if "error" not in s]
+        load_times = [s["cold_load_s"] for s in ok]
+        load_stats = summarize(load_times, digits=3)
+        score = load_stats.get("median", 0)
+
+        if ok:
+            median_mb_s = round(size_mb / score, 1) if size_mb and score else None
+            comment = f"Cold load {score} s (median of {len(ok)})"
+            if median_mb_s:
+                comment += f", {median_mb_s} MB/s"
+        else:
+            median_mb_s = None
+            comment = "Error: " + (samples[0].get("error", "?") if samples else "no runs")
+
+        return {
+            "id": "S",
+            "name": "Cold Start",
+            "description": "Model load time after unloading",
+            "unit": "s",
+            "score": score,
+            "comment": comment,
+            "details": {
+                "model_size_mb": size_mb,
+                "cold_load_s": load_stats,
+                "first_cold_load_s": ok[0]["cold_load_s"] if ok else None,
+                "cold_ttft_ms": summarize([s["cold_ttft_ms"] for s in ok if s["cold_ttft_ms"] is not None], digits=1),
+                "warm_ttft_ms": summarize([s["warm_ttft_ms"] for s in ok if s["warm_ttft_ms"] is not None], digits=1),
+                "load_mb_per_s": median_mb_s,
+                "runs": samples
+            }
+        }
+
+    # -------------------- SOAK TEST --------------------
+
+    def run_soak(self, test_model, options=None, progress_callback=None, duration_s=None, window_s=None):
+        """
+        Generiert ununterbrochen für duration_s Sekunden und misst TPS pro Zeitfenster,
+        parallel dazu GPU-Temperatur, Takt und Leistungsaufnahme.
+        Window TPS counts streamed chunks (one token each), so the prefill of every
+        follow-up request is part of the sustained number.
+        """
+        from .hardware import GpuTelemetrySampler
+
+        config = get_config()
+        duration_s = float(duration_s or config.get("soak_duration_s") or SOAK_DURATION_S)
+        window_s = float(window_s or config.get("soak_window_s") or SOAK_WINDOW_S)
+        if window_s * 2 > duration_s:
+            # The drop compares the first window with later ones, so at least two must fit
+            window_s = duration_s / 2
+        req_options = dict(options or {})
+        req_options["num_predict"] = SOAK_NUM_PREDICT
+
+        # Warmup, so loading the model does not end up in the first window
+        self.client.generate(test_model, "Hi", options=dict(req_options, num_predict=1), stream=False)
+
+        sampler = GpuTelemetrySampler(interval=1.0)
+        sampler.start()
+        start_t = time.time()
+        token_times = []
+        error = None
+        next_report = window_s
+        try:
+            while time.time() - start_t < duration_s and not error:
+                for chunk in self.client.generate(test_model, SOAK_PROMPT, options=req_options, stream=True):
+                    if "error" in chunk:
+                        error = chunk["error"]
+                        break
+                    if chunk.get("response"):
+                        token_times.append(time.time() - start_t)
+                    if chunk.get("done"):
+                        break
+                    if token_times and token_times[-1] >= next_report:
+                        if progress_callback:
+                            progress_callback(f"Soak test: {int(token_times[-1])}/{int(duration_s)} s...")
+                        next_report += window_s
+                    if time.time() - start_t >= duration_s:
+                        break
+        finally:
+            sampler.stop()
+        elapsed = time.time() - start_t
+
+        # Only complete windows, a partial last window would look like a throughput drop
+        windows = []
+        for i in range(int(elapsed // window_s)):
+            w_start, w_end = i * window_s, (i + 1) * window_s
+            tokens = sum(1 for t in token_times if w_start <= t < w_end)
+            hw = [smp for smp in sampler.samples if w_start <= smp["ts"] - start_t < w_end]
+
+            def avg(key):
+                values = [smp[key] for smp in hw if smp.get(key) is not None]
+                return round(sum(values) / len(values), 1) if values else None
+
+            windows.append({
+                "t_start_s": round(w_start, 1),
+                "tps": round(tokens / window_s, 2),
+                "temperature_c": avg("temperature_c"),
+                "clock_mhz": avg("clock_mhz"),
+                "power_w": avg("power_w"),
+                "vram_used_mb": avg("vram_used_mb")
+            })
+
+        initial_tps = windows[0]["tps"] if windows else 0
+        steady = windows[-SOAK_STEADY_WINDOWS:] if len(windows) > SOAK_STEADY_WINDOWS else windows[-1:]
+        steady_tps = round(sum(w["tps"] for w in steady) / len(steady), 2) if steady else 0
+        drop_pct = round((initial_tps - steady_tps) / initial_tps * 100, 1) if initial_tps else None
+
+        if error and not windows:
+            comment = f"Error: {error}"
+        elif len(windows) < 2:
+            comment = f"Not enough data: {len(windows)} complete window(s) of {window_s:g} s in {round(elapsed, 1)} s"
+        elif drop_pct is None:
+            comment = f"{steady_tps} t/s sustained, no tokens in the first {window_s:g} s"
+        else:
+            comment = f"{steady_tps} t/s sustained, {drop_pct}% below the first {window_s:g} s"
+
+        return {
+            "id": "T",
+            "name": "Sustained Load",
+            "description": "Rolling throughput under continuous generation",
+            "unit": "t/s",
+            "score": steady_tps,
+            "comment": comment,
+            "details": {
+                "duration_s": round(elapsed, 1),
+                "window_s": window_s,
+                "initial_tps": initial_tps,
+                "steady_state_tps": steady_tps,
+                "throughput_drop_pct": drop_pct,
+                "windows": windows,
+                "telemetry_source": next((smp["source"] for smp in sampler.samples if smp.get("source")), None),
+                "error": error
+            }
         }
 
     # -------------------- CONTENT BENCHMARKS --------------------
@@ -270,6 +1076,24 @@ class BenchmarkRunner:
         
         return self._judge_response(task_def, model_text)
 
+    def judge_generated(self, task_id, data):
+        """Bewertet eine bereits generierte Antwort ({"response", "metrics"} oder {"error"})"""
+        if not data or data.get("error"):
+            error = (data or {}).get("error", "?")
+            res = {"id": task_id, "score": 0, "comment": f"Gen Error: {error}", "issues": []}
+        else:
+            res = self.judge_response(task_id, data["response"])
+            if data.get("metrics") is not None:
+                res["metrics"] = data["metrics"]
+            if self.store_generations:
+                res["response"] = data["response"]
+        
+        # Add ID/Name if missing
+        res["id"] = task_id
+        task_def = self.get_task_def(task_id[0], task_id[1])
+        res["name"] = task_def.get("name", task_id)
+        return res
+
     def _run_content_task(self, category_id, task_id, test_model, options=None, progress_callback=None):
         """Führt einen einzelnen Content-Task aus"""
         if test_model == JUDGE_MODEL:
@@ -284,7 +1108,9 @@ class BenchmarkRunner:
         if progress_callback:
             progress_callback(f"Generating response for {category_id}{task_id}...")
 
+        start_t = time.time()
         res, error = self.generate_response(f"{category_id}{task_id}", test_model, options=options)
+        elapsed = time.time() - start_t
         if error:
             return {"id": f"{category_id}{task_id}", "score": 0, 
                     "comment": f"Generation error: {error}", "issues": [error]}
@@ -299,7 +1125,7 @@ class BenchmarkRunner:
         # Score bereits 1-10 vom Judge
         score = judge_result.get("score", 0)
 
-        return {
+        result = {
             "id": f"{category_id}{task_id}",
             "name": task_def.get("name", f"{category_id}{task_id}"),
             "description": task_def.get("task_desc", task_def.get("description", "")),
@@ -307,8 +1133,12 @@ class BenchmarkRunner:
             "comment": judge_result.get("comment", f"Score: {score}/10"),
             "issues": judge_result.get("issues", []),
             "judge_feedback": judge_result,
-            "category": category_id
+            "category": category_id,
+            "metrics": timing_breakdown(res, elapsed) if isinstance(res, dict) else {}
         }
+        if self.store_generations:
+            result["response"] = text
+        return result
 
     def _judge_response(self, task_def, model_text):
         """Bewertet eine Antwort mit dem Judge-Modell"""
@@ -358,48 +1188,100 @@ Evaluation Criteria:
 
 {rubric}
 """
-        try:
-            judge_res = self.client.generate(JUDGE_MODEL, judge_prompt, 
-                                           system=system_prompt, options=JUDGE_OPTIONS, stream=False)
-        except Exception as e:
-            return {
-                "score": 1,
-                "issues": [f"Judge call failed: {e}"],
-                "comment": "Judge call failed, minimal score assigned"
-            }
+        cache_key = None
+        if self.judge_cache:
+            # The rendered prompt contains task definition and model answer
+            cache_key = self.judge_cache.make_key({
+                "model": JUDGE_MODEL,
+                "options": JUDGE_OPTIONS,
+                "format": JUDGE_SCHEMA,
+                "system": system_prompt,
+                "prompt": judge_prompt,
+            })
+            cached = self.judge_cache.get(cache_key)
+            if cached is not None:
+                return cached
 
-        raw = judge_res.get("response") or ""
-        try:
-            # Robustes JSON-Parsing mit Regex
-            match = re.search(r'\{.*\}', raw, re.DOTALL)
-            if match:
-                parsed = json.loads(match.group())
-            else:
-                # Fallback: Suche nach geschweiften Klammern
-                start = raw.find("{")
-                end = raw.rfind("}")
-                if start >= 0 and end > start:
-                    parsed = json.loads(raw[start:end+1])
-                else:
-                    raise ValueError("No JSON object found in response")
-            
-            # Sicherstellen, dass Score 1-10 ist
-            score = float(parsed.get("score", 1))
-            parsed["score"] = min(10, max(1, round(score)))
-            
-            # Raw-Feedback vom Judge mitspeichern
-            parsed["full_judge_response"] = raw
-            
-        except Exception as e:
+        # Bounded retry: a broken verdict costs another judge call, not a score of 1
+        errors = []
+        raw = ""
+        parsed = None
+        prompt, options = judge_prompt, JUDGE_OPTIONS
+        for attempt in range(1, JUDGE_MAX_ATTEMPTS + 1):
+            try:
+                raw = self._stream_verdict(prompt, system_prompt, options)
+                parsed = self._parse_verdict(raw)
+                break
+            except JudgeCallError as e:
+                # Connection problem: the same request again
+                errors.append(f"Attempt {attempt}: {e}")
+            except Exception as e:
+                # Unparseable or invalid verdict: change the request, otherwise it fails the same way
+                errors.append(f"Attempt {attempt}: {e}")
+                options = dict(JUDGE_OPTIONS, temperature=JUDGE_RETRY_TEMPERATURE, seed=attempt,
+                               num_predict=JUDGE_OPTIONS["num_predict"] * 2 ** attempt)
+                prompt = (f"{judge_prompt}\nYour previous answer was rejected ({e}). "
+                          "Return one complete JSON object and keep the comment short.\n")
+
+        if parsed is None:
             return {
                 "score": 1,
-                "issues": [f"Judge JSON parse error: {e}", raw[:200]],
-                "comment": "JSON parse error, minimal score assigned",
-                "full_judge_response": raw
+                "issues": errors + ([raw[:200]] if raw else []),
+                "comment": f"No valid judge verdict after {JUDGE_MAX_ATTEMPTS} attempts, minimal score assigned",
+                "full_judge_response": raw,
+                "judge_failed": True
             }
 
+        if errors:
+            parsed["judge_attempts"] = len(errors) + 1
+        # Raw-Feedback vom Judge mitspeichern
+        parsed["full_judge_response"] = raw
+
+        if cache_key:
+            self.judge_cache.put(cache_key, parsed)
         return parsed
 
+    def _stream_verdict(self, judge_prompt, system_prompt, options=JUDGE_OPTIONS):
+        """
+        Streamt die Judge-Antwort und bricht ab, sobald das JSON-Objekt geschlossen ist.
+        Closing the generator drops the connection, which makes Ollama stop decoding.
+        """
+        scanner = JsonObjectScanner()
+        stream_gen = self.client.generate(JUDGE_MODEL, judge_prompt, system=system_prompt,
+                                          options=options, stream=True, format=JUDGE_SCHEMA)
+        try:
+            for chunk in stream_gen:
+                if "error" in chunk:
+                    raise JudgeCallError(f"Judge call failed: {chunk['error']}")
+                if scanner.feed(chunk.get("response", "")) or chunk.get("done"):
+                    break
+        finally:
+            stream_gen.close()
+        return scanner.object_text()
+
+    def _parse_verdict(self, raw):
+        """Parst und validiert die (schema-konforme) Judge-Antwort, wirft ValueError bei Fehlern"""
+        parsed = json.loads(raw)
+        if not isinstance(parsed, dict):
+            raise ValueError("Verdict is not a JSON object")
+
+        score = parsed.get("score")
+        if isinstance(score, bool) or not isinstance(score, (int, float)):
+            raise ValueError(f"Invalid score: {score!r}")
+        issues = parsed.get("issues", [])
+        if not isinstance(issues, list):
+            raise ValueError("issues must be a list")
+        comment = parsed.get("comment", "")
+        if not isinstance(comment, str):
+            raise ValueError("comment must be a string")
+
+        return {
+            # Sicherstellen, dass Score 1-10 ist
+            "score": min(10, max(1, round(score))),
+            "issues": [str(i) for i in issues],
+            "comment": comment
+        }
+
     # -------------------- BENCHMARK DEFINITIONS --------------------
 
     def get_category_def(self, category_id):
@@ -0,0 +1,194 @@
+"""
+Headless command line interface, no PySide6 required.
+
+    python -m backend.cli run llama3.1:8b
+    python -m backend.cli autopilot llama3.1:8b qwen2.5:7b --no-upload
+    python -m backend.cli rejudge results/
+    python -m backend.cli speed llama3.1:8b --prompts numbers code german
+"""
+
+import sys
+import json
+import argparse
+
+from .ollama_client import OllamaClient, get_config
+from .benchmarks import BenchmarkRunner, SPEED_PROMPTS
+from .hardware import get_hardware_info
+from .session import BenchmarkSession, AutopilotSession, save_results, quality_score, RESULTS_DIR
+from .events import (EventBus, JsonlEventLogger, Progress, Log, TaskStarted, Chunk, TaskJudged,
+                     CategoryCompiled, ModelStarted, ModelFinished, RunFailed)
+
+def _print(message):
+    print(message, flush=True)
+
+def _score_text(result):
+    unit = result.get("unit")
+    return f"{result.get('score')} {unit}" if unit else f"{result.get('score')}/10"
+
+class ConsolePrinter:
+    """Event subscriber for the terminal; log lines and answer text only with verbose"""
+
+    TASK_PHASES = {"generate": "generating...", "judge": "judging..."}
+
+    def __init__(self, verbose=False):
+        self.verbose = verbose
+        self._last_percent = None
+
+    def __call__(self, event):
+        if isinstance(event, ModelStarted):
+            _print(f"--- {event.model} ---")
+        elif isinstance(event, ModelFinished):
+            _print(f"==> {event.model}: {round(quality_score(event.results), 2)}/110")
+        elif isinstance(event, RunFailed):
+            _print(f"ERROR: {event.message}")
+        elif isinstance(event, Progress):
+            if event.percent is not None:
+                # Downloads report every few kilobytes, print each percent once
+                if (event.bench_id, event.percent) == self._last_percent:
+                    return
+                self._last_percent = (event.bench_id, event.percent)
+            _print(f"[{event.bench_id}] {event.message}")
+        elif isinstance(event, TaskStarted):
+            _print(f"[{event.task_id}] {self.TASK_PHASES.get(event.phase, event.phase)}")
+        elif isinstance(event, TaskJudged):
+            _print(f"[{event.task_id}] judged: {event.result.get('score', 0)}/10")
+        elif isinstance(event, CategoryCompiled):
+            _print(f"==> {event.bench_id}: {_score_text(event.result)} {event.result.get('comment', '')}")
+        elif self.verbose and isinstance(event, Log):
+            _print(event.message)
+        elif self.verbose and isinstance(event, Chunk):
+            print(event.text, end="", flush=True)
+
+def _event_bus(args, verbose):
+    """Bus with the console printer and, with --event-log, a JSON lines logger"""
+    events = EventBus()
+    events.subscribe(ConsolePrinter(verbose=verbose), name="ConsolePrinter")
+    logger = None
+    if args.event_log:
+        logger = JsonlEventLogger(args.event_log)
+        events.subscribe(logger, name="JsonlEventLogger")
+    return events, logger
+
+def cmd_run(args):
+    events, logger = _event_bus(args, args.verbose)
+    session = BenchmarkSession(
+        args.model, get_hardware_info(), context_window=args.context, concurrency=args.concurrency,
+        pipelined=True if args.pipelined else None, events=events
+    )
+    try:
+        results = session.run()
+    except KeyboardInterrupt:
+        session.stop()
+        _print("Aborted.")
+        return 130
+    finally:
+        events.close()
+        if logger:
+            logger.close()
+
+    filename = save_results(results, args.output_dir)
+    _print(f"Total Quality Score: {round(quality_score(results), 2)}/110")
+    _print(f"Results saved to {filename}")
+    return 0
+
+def cmd_autopilot(args):
+    config = get_config()
+    token = args.token or config.get("github_token")
+    if not args.no_upload and not token:
+        _print("A GitHub token is required for uploading (--token or github_token in config.json), or use --no-upload.")
+        return 2
+
+    # The autopilot log (pulls, uploads, cleanup) is the main output, so always verbose
+    events, logger = _event_bus(args, verbose=True)
+    session = AutopilotSession(
+        token, args.models, get_hardware_info(), context_window=args.context or config.get("context_window"),
+        autocleanup=args.autocleanup, pipelined=True if args.pipelined else None,
+        upload=not args.no_upload, output_dir=args.output_dir, events=events
+    )
+    try:
+        finished = session.run()
+    except KeyboardInterrupt:
+        session.stop()
+        _print("Aborted.")
+        return 130
+    finally:
+        events.close()
+        if logger:
+            logger.close()
+    if session.error:
+        return 1
+    return 0 if len(finished) == len(args.models) else 1
+
+def cmd_rejudge(args):
+    from .rejudge import main as rejudge_main
+    argv = list(args.paths)
+    if args.output_dir:
+        argv += ["--output-dir", args.output_dir]
+    if args.in_place:
+        argv.append("--in-place")
+    return rejudge_main(argv)
+
+def cmd_speed(args):
+    runner = BenchmarkRunner(OllamaClient())
+    options = {"num_ctx": int(args.context)} if args.context else None
+    result = runner.run_speed(args.model, options=options, progress_callback=_print, samples=args.samples,
+                              num_predict=args.num_predict, prompts=args.prompts)
+    if args.json:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+        return 0
+
+    _print(result["comment"])
+    details = result["details"]
+    for name, variant in (details.get("variants") or {}).items():
+        _print(f"  {name:<8} {variant['tokens_per_sec']:>8} t/s  {variant['chars_per_token']} chars/token")
+    _print(f"  prefill {details.get('prefill_tps')} t/s, decode {details.get('decode_tps')} t/s, "
+           f"load {details.get('load_time_s')} s")
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m backend.cli", description="LLMark without the GUI")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Full benchmark suite for one model")
+    run.add_argument("model")
+    run.add_argument("--context", type=int, help="num_ctx for all requests")
+    run.add_argument("--concurrency", type=int, help="Tasks generated at once (default: generation_concurrency)")
+    run.add_argument("--pipelined", action="store_true", help="Judge while generating")
+    run.add_argument("--output-dir", default=RESULTS_DIR, help=f"Where to write the result JSON (default: {RESULTS_DIR})")
+    run.add_argument("--event-log", help="Append all progress events to this file (JSON lines)")
+    run.add_argument("-v", "--verbose", action="store_true", help="Print the detailed log and the answers")
+    run.set_defaults(func=cmd_run)
+
+    auto = sub.add_parser("autopilot", help="Pull, benchmark and upload several models")
+    auto.add_argument("models", nargs="+")
+    auto.add_argument("--token", help="GitHub token (default: github_token from config.json)")
+    auto.add_argument("--context", type=int, help="num_ctx for all requests")
+    auto.add_argument("--autocleanup", action="store_true", help="Delete every model after its run")
+    auto.add_argument("--pipelined", action="store_true", help="Judge while generating")
+    auto.add_argument("--no-upload", action="store_true", help="Do not open pull requests")
+    auto.add_argument("--output-dir", default=RESULTS_DIR, help=f"Where to write the result JSONs (default: {RESULTS_DIR})")
+    auto.add_argument("--event-log", help="Append all progress events to this file (JSON lines)")
+    auto.set_defaults(func=cmd_autopilot)
+
+    rejudge = sub.add_parser("rejudge", help="Re-judge stored results (see backend.rejudge)")
+    rejudge.add_argument("paths", nargs="+")
+    rejudge.add_argument("--output-dir")
+    rejudge.add_argument("--in-place", action="store_true")
+    rejudge.set_defaults(func=cmd_rejudge)
+
+    speed = sub.add_parser("speed", help="Only the speed benchmark (A)")
+    speed.add_argument("model")
+    speed.add_argument("--context", type=int, help="num_ctx for all requests")
+    speed.add_argument("--samples", type=int, help="Measured repetitions (default: speed_samples)")
+    speed.add_argument("--num-predict", type=int, help="Fixed decode length, 0 = let the model stop")
+    speed.add_argument("--prompts", nargs="+", choices=sorted(SPEED_PROMPTS), help="Prompt variants, the first gives the score")
+    speed.add_argument("--json", action="store_true", help="Print the result as JSON")
+    speed.set_defaults(func=cmd_speed)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
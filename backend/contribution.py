@@ -3,7 +3,6 @@ import base64
 import json
 import time
 from datetime import datetime
-from github import Github, GithubException
 
 LLMARK_REPO_NAME = "SnowTimSwiss/LLMark-Site"
 BENCHMARK_PATH_PREFIX = "data/benchmarks/"
@@ -27,6 +26,9 @@ class ContributionManager:
         Returns:
             str: URL of the created Pull Request.
         """
+        # PyGithub is only needed here, most sessions never upload
+        from github import Github, GithubException
+
         try:
             g = Github(token)
             user = g.get_user()
@@ -0,0 +1,238 @@
+"""
+Progress events of a benchmark run and the bus that delivers them.
+
+BenchmarkSession and AutopilotSession publish events, frontends subscribe: the
+GUI turns them into Qt signals, the CLI prints them, JsonlEventLogger writes
+them to a file.
+Every subscriber has its own bounded queue and thread, so a slow consumer
+never blocks generation:
+- Chunk events of a task are merged while they wait in the queue, but never
+  across any other event, so text and log lines stay in publish order
+- when a queue is full, the oldest status event (Progress, Log, TaskStarted)
+  is discarded, then the oldest Chunk; results (TaskGenerated, TaskJudged,
+  CategoryCompiled, RunFinished) and the autopilot's model events are never dropped
+"""
+
+import json
+import time
+import threading
+import traceback
+from collections import deque
+from dataclasses import dataclass, field, asdict
+
+DEFAULT_QUEUE_SIZE = 1000
+
+@dataclass
+class Event:
+    ts: float = field(default_factory=time.time, init=False)
+
+    @property
+    def kind(self):
+        return type(self).__name__
+
+    def to_dict(self):
+        return {"event": self.kind, **asdict(self)}
+
+@dataclass
+class Progress(Event):
+    """Status line of a benchmark or task, percent for downloads"""
+    bench_id: str
+    message: str
+    percent: int = None
+
+@dataclass
+class Log(Event):
+    """Line for the verbose log"""
+    message: str
+
+@dataclass
+class TaskStarted(Event):
+    """A task enters a phase ("generate" or "judge")"""
+    task_id: str
+    phase: str
+
+@dataclass
+class Chunk(Event):
+    """Streamed answer text, may contain several merged chunks"""
+    task_id: str
+    text: str
+
+@dataclass
+class TaskGenerated(Event):
+    """data is {"response": ..., "metrics": ...} or {"error": ...}"""
+    task_id: str
+    data: dict
+
+@dataclass
+class TaskJudged(Event):
+    task_id: str
+    result: dict
+
+@dataclass
+class CategoryCompiled(Event):
+    """Finished category (B-X), also A and the performance benchmarks"""
+    bench_id: str
+    result: dict
+
+@dataclass
+class RunFinished(Event):
+    results: dict
+
+@dataclass
+class ModelStarted(Event):
+    """Autopilot: the next model of the list"""
+    model: str
+
+@dataclass
+class ModelFinished(Event):
+    """Autopilot: result JSON of one model (already saved/uploaded)"""
+    model: str
+    results: dict
+
+@dataclass
+class RunFailed(Event):
+    """Fatal error, the run stops"""
+    message: str
+
+STATUS_EVENTS = (Progress, Log, TaskStarted)
+
+
+class Subscription:
+    """Bounded queue plus a thread that feeds one handler"""
+
+    def __init__(self, handler, maxsize=DEFAULT_QUEUE_SIZE, coalesce=True, name=None):
+        self.handler = handler
+        self.maxsize = maxsize
+        self.coalesce = coalesce
+        self.dropped = 0
+        self.coalesced = 0
+        self._queue = deque()
+        self._open_chunks = {}  # task_id -> queued chunk entry that can still take text
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=name or "EventSubscriber", daemon=True)
+        self._thread.start()
+
+    def put(self, event):
+        with self._cond:
+            if self._closed:
+                return
+            if isinstance(event, Chunk):
+                entry = self._open_chunks.get(event.task_id) if self.coalesce else None
+                if entry is not None:
+                    entry[1].append(event.text)
+                    self.coalesced += 1
+                    return
+                entry = [event, [event.text]]
+                self._open_chunks[event.task_id] = entry
+                self._queue.append(entry)
+            else:
+                # Anything else ends every merge window: text published later must not
+                # overtake this event (chunks of parallel tasks can still merge among each other)
+                self._open_chunks.clear()
+                self._queue.append(event)
+
+            if len(self._queue) > self.maxsize:
+                self._drop_oldest()
+            self._cond.notify()
+
+    def _drop_oldest(self):
+        # Status lines are superseded by the next one anyway, answer text only goes as a last resort
+        for droppable in (STATUS_EVENTS, Chunk):
+            for i, item in enumerate(self._queue):
+                event = item[0] if isinstance(item, list) else item
+                if isinstance(event, droppable):
+                    del self._queue[i]
+                    if isinstance(item, list) and self._open_chunks.get(event.task_id) is item:
+                        del self._open_chunks[event.task_id]
+                    self.dropped += 1
+                    return
+
+    def _next(self):
+        with self._cond:
+            while not self._queue and not self._closed:
+                self._cond.wait()
+            if not self._queue:
+                return None
+            item = self._queue.popleft()
+            if isinstance(item, list):
+                event, texts = item
+                if self._open_chunks.get(event.task_id) is item:
+                    del self._open_chunks[event.task_id]
+                return Chunk(event.task_id, "".join(texts))
+            return item
+
+    def _run(self):
+        while True:
+            event = self._next()
+            if event is None:
+                break
+            try:
+                self.handler(event)
+            except Exception:
+                traceback.print_exc()
+
+    def close(self, wait=True):
+        """Stops after the queued events are delivered"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if wait and self._thread is not threading.current_thread():
+            self._thread.join()
+
+
+class EventBus:
+    def __init__(self):
+        self._subscriptions = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, handler, maxsize=DEFAULT_QUEUE_SIZE, coalesce=True, name=None):
+        """
+        handler(event) is called from a separate thread, in publish order; merged
+        Chunk text of one task is delivered at the position of its first chunk
+        """
+        subscription = Subscription(handler, maxsize=maxsize, coalesce=coalesce, name=name)
+        with self._lock:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription, wait=True):
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+        subscription.close(wait)
+
+    def publish(self, event):
+        """Never blocks on subscribers"""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            subscription.put(event)
+
+    def close(self, wait=True):
+        """Delivers what is queued, then stops all subscribers"""
+        with self._lock:
+            subscriptions = self._subscriptions
+            self._subscriptions = []
+        for subscription in subscriptions:
+            subscription.close(wait)
+
+
+class JsonlEventLogger:
+    """Subscriber that writes every event as one JSON line"""
+
+    def __init__(self, path):
+        self._file = open(path, "a", encoding="utf-8")
+
+    def __call__(self, event):
+        if isinstance(event, (RunFinished, ModelFinished)):
+            # The full result JSON is written separately, keep the log small
+            record = {"event": event.kind, "ts": event.ts, "model": event.results.get("model"),
+                      "total_score": event.results.get("total_score")}
+        else:
+            record = event.to_dict()
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
@@ -4,32 +4,215 @@ import datetime
 import warnings
 import subprocess
 import re
+import os
+import glob
+import json
+import time
+import atexit
+import hashlib
+import threading
 
 # Suppress pynvml deprecation warning
 warnings.filterwarnings("ignore", category=FutureWarning, message="The pynvml package is deprecated")
 
-try:
-    import pynvml
-except ImportError:
-    pynvml = None
-import cpuinfo
+# Imported on first use (_import_pynvml), most code paths never need it
+pynvml = None
+_pynvml_loaded = False
 
-def get_vram_usage_mb():
+def _import_pynvml():
+    global pynvml, _pynvml_loaded
+    if not _pynvml_loaded:
+        _pynvml_loaded = True
+        try:
+            import pynvml as module
+            pynvml = module
+        except ImportError:
+            pynvml = None
+    return pynvml
+
+class NvmlSampler:
     """
-    Returns current global VRAM usage in MB.
-    Tries NVIDIA first, then Windows Counters.
+    Long-lived NVML session: nvmlInit() once, device handles are kept, so a
+    sample is only the actual queries (the old code spent most of every sample
+    in nvmlInit/nvmlShutdown). Covers all NVIDIA GPUs, not just device 0.
+    available is False when pynvml or the driver is missing.
     """
-    # NVIDIA
-    if pynvml:
+
+    def __init__(self):
+        self.handles = []
+        self.names = []
+        self.available = False
+        self._lock = threading.Lock()
+        if not _import_pynvml():
+            return
         try:
             pynvml.nvmlInit()
-            if pynvml.nvmlDeviceGetCount() > 0:
-                handle = pynvml.nvmlDeviceGetHandleByIndex(0)
-                mem = pynvml.nvmlDeviceGetMemoryInfo(handle)
-                pynvml.nvmlShutdown()
-                return round(mem.used / 1024 / 1024, 2)
-        except:
+        except Exception:
+            return
+        try:
+            for i in range(pynvml.nvmlDeviceGetCount()):
+                handle = pynvml.nvmlDeviceGetHandleByIndex(i)
+                name = pynvml.nvmlDeviceGetName(handle)
+                if isinstance(name, bytes):
+                    name = name.decode('utf-8')
+                self.handles.append(handle)
+                self.names.append(name)
+        except Exception:
             pass
+        self.available = bool(self.handles)
+        if not self.available:
+            self._shutdown()
+
+    @staticmethod
+    def _query(func, *args):
+        # Not every GPU supports every query (e.g. power on laptop GPUs)
+        try:
+            return func(*args)
+        except Exception:
+            return None
+
+    def sample(self):
+        """Per-device dicts: index, name, vram used/total (MB), utilization (%), power (W), SM clock (MHz), temperature (C)"""
+        devices = []
+        with self._lock:
+            for index, (handle, name) in enumerate(zip(self.handles, self.names)):
+                mem = self._query(pynvml.nvmlDeviceGetMemoryInfo, handle)
+                util = self._query(pynvml.nvmlDeviceGetUtilizationRates, handle)
+                power = self._query(pynvml.nvmlDeviceGetPowerUsage, handle)
+                devices.append({
+                    "index": index,
+                    "name": name,
+                    "vram_used_mb": round(mem.used / 1024 / 1024, 2) if mem else None,
+                    "vram_total_mb": round(mem.total / 1024 / 1024, 2) if mem else None,
+                    "util_pct": util.gpu if util else None,
+                    "power_w": round(power / 1000.0, 1) if power is not None else None,
+                    "clock_mhz": self._query(pynvml.nvmlDeviceGetClockInfo, handle, pynvml.NVML_CLOCK_SM),
+                    "temperature_c": self._query(pynvml.nvmlDeviceGetTemperature, handle, pynvml.NVML_TEMPERATURE_GPU),
+                })
+        return devices
+
+    def _shutdown(self):
+        try:
+            pynvml.nvmlShutdown()
+        except Exception:
+            pass
+
+    def close(self):
+        with self._lock:
+            if self.available:
+                self.available = False
+                self.handles = []
+                self._shutdown()
+
+_nvml_sampler = None
+_nvml_lock = threading.Lock()
+
+def get_nvml_sampler():
+    """Process-wide NvmlSampler, created on first use and shut down at exit"""
+    global _nvml_sampler
+    with _nvml_lock:
+        if _nvml_sampler is None:
+            _nvml_sampler = NvmlSampler()
+            atexit.register(_nvml_sampler.close)
+        return _nvml_sampler
+
+SYSFS_ROOT = "/sys"
+# Static hardware info, keyed by _machine_fingerprint(). Next to config.json, not in
+# results/, which only holds benchmark results (rejudge, contribution)
+HARDWARE_CACHE_PATH = os.path.join(".llmark_cache", "hardware.json")
+DRM_VENDORS = {"0x1002": "AMD", "0x8086": "Intel"}
+
+def _read_sysfs_text(path):
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+class DrmSampler:
+    """
+    AMD and Intel GPUs on Linux via sysfs (class/drm/cardN/device), plain file reads:
+    mem_info_vram_used/total, gpu_busy_percent and the hwmon power, temperature and
+    clock files of the device. root can point to a fake tree for testing.
+    Returns the same per-device dicts as NvmlSampler.sample().
+    """
+
+    def __init__(self, root=SYSFS_ROOT):
+        self.root = root
+        self.devices = []  # (index, name, device directory, hwmon directory or None)
+        cards = glob.glob(os.path.join(root, "class", "drm", "card*"))
+        # cardN only, not the connector entries like card0-DP-1
+        cards = sorted((c for c in cards if re.fullmatch(r"card\d+", os.path.basename(c))),
+                       key=lambda c: int(os.path.basename(c)[4:]))
+        for card in cards:
+            device = os.path.join(card, "device")
+            vendor = DRM_VENDORS.get(_read_sysfs_text(os.path.join(device, "vendor")) or "")
+            if not vendor:
+                continue
+            name = (_read_sysfs_text(os.path.join(device, "product_name"))
+                    or f"{vendor} GPU {_read_sysfs_text(os.path.join(device, 'device')) or ''}".strip())
+            hwmons = sorted(glob.glob(os.path.join(device, "hwmon", "hwmon*")))
+            self.devices.append((len(self.devices), name, device, hwmons[0] if hwmons else None))
+        self.available = bool(self.devices)
+
+    def sample(self):
+        devices = []
+        for index, name, device, hwmon in self.devices:
+            used = _read_sysfs_number(os.path.join(device, "mem_info_vram_used"), 1 / 1024 / 1024)
+            total = _read_sysfs_number(os.path.join(device, "mem_info_vram_total"), 1 / 1024 / 1024)
+            busy = _read_sysfs_number(os.path.join(device, "gpu_busy_percent"))
+            entry = {
+                "index": index,
+                "name": name,
+                "vram_used_mb": round(used, 2) if used is not None else None,
+                "vram_total_mb": round(total, 2) if total is not None else None,
+                "util_pct": int(busy) if busy is not None else None,
+                "power_w": None,
+                "clock_mhz": None,
+                "temperature_c": None,
+            }
+            if hwmon:
+                power = (_read_sysfs_number(os.path.join(hwmon, "power1_average"), 1e-6)
+                         or _read_sysfs_number(os.path.join(hwmon, "power1_input"), 1e-6))
+                # amdgpu reports the shader clock in Hz as freq1_input
+                clock_hz = _read_sysfs_number(os.path.join(hwmon, "freq1_input"))
+                temp = _read_sysfs_number(os.path.join(hwmon, "temp1_input"), 0.001)
+                entry["power_w"] = round(power, 1) if power is not None else None
+                entry["clock_mhz"] = round(clock_hz / 1_000_000) if clock_hz else None
+                entry["temperature_c"] = round(temp, 1) if temp is not None else None
+            devices.append(entry)
+        return devices
+
+_drm_sampler = None
+
+def get_drm_sampler():
+    """Process-wide DrmSampler (device discovery once), never available outside Linux"""
+    global _drm_sampler
+    with _nvml_lock:
+        if _drm_sampler is None:
+            _drm_sampler = DrmSampler()
+        return _drm_sampler
+
+def get_gpu_devices():
+    """Returns (source, per-device samples) of the first available GPU backend, or (None, [])"""
+    nvml = get_nvml_sampler()
+    if nvml.available:
+        return "nvml", nvml.sample()
+    drm = get_drm_sampler()
+    if drm.available:
+        return "sysfs", drm.sample()
+    return None, []
+
+def get_vram_usage_mb():
+    """
+    Returns current global VRAM usage in MB (sum over all GPUs).
+    Tries NVIDIA first, then Linux sysfs, then Windows Counters.
+    """
+    # NVIDIA (NVML), AMD/Intel on Linux (sysfs)
+    source, devices = get_gpu_devices()
+    used = [d["vram_used_mb"] for d in devices if d["vram_used_mb"] is not None]
+    if used:
+        return round(sum(used), 2)
     
     # Windows Counters (AMD/Intel/Generic)
     if platform.system() == "Windows":
@@ -46,7 +229,140 @@ def get_vram_usage_mb():
             pass
     return 0.0
 
-def get_hardware_info():
+def _read_sysfs_number(path, scale=1.0):
+    try:
+        with open(path, "r") as f:
+            return float(f.read().strip()) * scale
+    except (OSError, ValueError):
+        return None
+
+def get_gpu_telemetry():
+    """
+    Returns temperature (C), core clock (MHz), power (W) and VRAM usage (MB) of the GPU.
+    NVIDIA via NVML, otherwise Linux sysfs (amdgpu, i915, xe). Missing values are None.
+    """
+    telemetry = {"temperature_c": None, "clock_mhz": None, "power_w": None, "vram_used_mb": None, "source": None}
+
+    source, devices = get_gpu_devices()
+    if devices:
+        # Throttling shows on the hottest GPU first, power and memory add up
+        hottest = max(devices, key=lambda d: d["temperature_c"] or 0)
+        powers = [d["power_w"] for d in devices if d["power_w"] is not None]
+        used = [d["vram_used_mb"] for d in devices if d["vram_used_mb"] is not None]
+        telemetry["temperature_c"] = hottest["temperature_c"]
+        telemetry["clock_mhz"] = hottest["clock_mhz"]
+        telemetry["power_w"] = round(sum(powers), 1) if powers else None
+        telemetry["vram_used_mb"] = round(sum(used), 2) if used else None
+        telemetry["source"] = source
+        if len(devices) > 1:
+            telemetry["gpus"] = devices
+        if telemetry["vram_used_mb"] is not None:
+            return telemetry
+
+    telemetry["vram_used_mb"] = get_vram_usage_mb()
+    return telemetry
+
+class GpuTelemetrySampler(threading.Thread):
+    """
+    Samples get_gpu_telemetry() in the background (temperature, clock and power, which
+    the VRAM-only TelemetrySampler does not read). Every sample carries its time.time() as "ts".
+    """
+
+    def __init__(self, interval=1.0):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.running = True
+        self.samples = []
+
+    def run(self):
+        while self.running:
+            sample = get_gpu_telemetry()
+            sample["ts"] = time.time()
+            self.samples.append(sample)
+            time.sleep(self.interval)
+
+    def stop(self):
+        self.running = False
+        self.join()
+
+def _machine_fingerprint():
+    """
+    Hash over the boot ID and DMI/BIOS data. Changes after a reboot or a hardware
+    swap, which is when the cached static hardware info has to be probed again.
+    """
+    parts = [platform.node(), platform.system(), platform.release(), platform.machine()]
+
+    boot_id = _read_sysfs_text("/proc/sys/kernel/random/boot_id")
+    if not boot_id:
+        try:
+            boot_id = str(psutil.boot_time())
+        except Exception:
+            boot_id = ""
+    parts.append(boot_id)
+
+    for field in ("sys_vendor", "product_name", "product_version", "board_vendor", "board_name",
+                  "bios_version", "bios_date"):
+        parts.append(_read_sysfs_text(os.path.join(SYSFS_ROOT, "class", "dmi", "id", field)) or "")
+
+    if platform.system() == "Windows":
+        try:
+            import winreg
+            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"HARDWARE\DESCRIPTION\System\BIOS") as key:
+                for value in ("SystemManufacturer", "SystemProductName", "BaseBoardProduct", "BIOSVersion", "BIOSReleaseDate"):
+                    try:
+                        parts.append(str(winreg.QueryValueEx(key, value)[0]))
+                    except OSError:
+                        parts.append("")
+        except Exception:
+            pass
+
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+def _load_cached_info(path, fingerprint):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get("fingerprint") != fingerprint:
+        return None
+    return cached.get("info")
+
+def _save_cached_info(path, fingerprint, info):
+    try:
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": fingerprint, "info": info}, f, indent=2)
+    except OSError:
+        pass
+
+def refresh_hardware_info(info):
+    """Copy of info with only the dynamic fields (vram_used_mb, date_utc) updated"""
+    info = dict(info)
+    info['vram_used_mb'] = get_vram_usage_mb()
+    info['date_utc'] = datetime.datetime.utcnow().isoformat()
+    return info
+
+def get_hardware_info(use_cache=True, cache_path=HARDWARE_CACHE_PATH):
+    """
+    Hardware summary for the result JSON. The static part (CPU, RAM, GPUs, VRAM totals)
+    is probed once per machine fingerprint and cached in cache_path, because py-cpuinfo
+    alone takes seconds. Only vram_used_mb and date_utc are read every time.
+    """
+    info = None
+    fingerprint = None
+    if use_cache:
+        fingerprint = _machine_fingerprint()
+        info = _load_cached_info(cache_path, fingerprint)
+    if info is None:
+        info = _probe_hardware_info()
+        if use_cache:
+            _save_cached_info(cache_path, fingerprint, info)
+    return refresh_hardware_info(info)
+
+def _probe_hardware_info():
     info = {
         "os": f"{platform.system()} {platform.release()}",
         "cpu": "Unknown",
@@ -54,11 +370,12 @@ def get_hardware_info():
         "gpu": None,
         "vram_total_mb": None,
         "vram_used_mb": None,
-        "date_utc": datetime.datetime.utcnow().isoformat()
+        "date_utc": None
     }
 
-    # CPU
+    # CPU (py-cpuinfo is slow to import and to run, only needed on a cache miss)
     try:
+        import cpuinfo
         cpu_info = cpuinfo.get_cpu_info()
         info['cpu'] = cpu_info.get('brand_raw', platform.processor())
     except Exception:
@@ -70,25 +387,22 @@ def get_hardware_info():
     except Exception:
         pass
 
-    # GPU (NVIDIA via pynvml)
+    # GPU (NVIDIA via pynvml, AMD/Intel on Linux via sysfs; all devices)
     gpu_found = False
-    try:
-        if pynvml:
-            pynvml.nvmlInit()
-            device_count = pynvml.nvmlDeviceGetCount()
-            if device_count > 0:
-                handle = pynvml.nvmlDeviceGetHandleByIndex(0)
-                name = pynvml.nvmlDeviceGetName(handle)
-                if isinstance(name, bytes):
-                    name = name.decode('utf-8')
-                info['gpu'] = name
-                
-                mem_info = pynvml.nvmlDeviceGetMemoryInfo(handle)
-                info['vram_total_mb'] = round(mem_info.total / 1024 / 1024, 2)
-                gpu_found = True
-            pynvml.nvmlShutdown()
-    except Exception:
-        pass
+    source, devices = get_gpu_devices()
+    if devices:
+        names = [d["name"] for d in devices]
+        if len(names) == 1:
+            info['gpu'] = names[0]
+        elif len(set(names)) == 1:
+            info['gpu'] = f"{len(names)}x {names[0]}"
+        else:
+            info['gpu'] = " + ".join(names)
+        totals = [d["vram_total_mb"] for d in devices if d["vram_total_mb"] is not None]
+        info['vram_total_mb'] = round(sum(totals), 2) if totals else None
+        if len(devices) > 1:
+            info['gpus'] = [{"name": d["name"], "vram_total_mb": d["vram_total_mb"]} for d in devices]
+        gpu_found = True
 
     if not gpu_found and platform.system() == "Windows":
         # AMD / Generic via Registry key for accurate VRAM size (using winreg)
@@ -143,9 +457,6 @@ def get_hardware_info():
         except Exception:
              pass
 
-    # Current usage
-    info['vram_used_mb'] = get_vram_usage_mb()
-
     return info
 
     return info
@@ -0,0 +1,128 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+from .ollama_client import get_config
+
+DEFAULT_CACHE_PATH = os.path.join("results", "judge_cache.sqlite")
+DEFAULT_MAX_MB = 64
+
+class JudgeCache:
+    """
+    On-disk cache for judge verdicts (SQLite).
+
+    The key is a SHA-256 over the complete judge request (judge model, options,
+    system prompt and the rendered prompt, which contains the task definition and
+    the model answer). With temperature 0 the same request always yields the same
+    verdict, so a repeat run of a deterministic model needs no judge calls at all.
+
+    When the stored verdicts exceed max_bytes, the least recently used entries
+    are evicted.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_MB * 1024 * 1024):
+        self.path = path
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        # Used from the judge pipeline thread as well, access is serialized via _lock
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS verdicts ("
+            " key TEXT PRIMARY KEY,"
+            " verdict TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_verdicts_last_used ON verdicts(last_used)")
+
+    @staticmethod
+    def make_key(request):
+        """Stable hash over a JSON-serializable judge request"""
+        blob = json.dumps(request, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT verdict FROM verdicts WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE verdicts SET last_used = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, key, verdict):
+        blob = json.dumps(verdict, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO verdicts (key, verdict, size, created, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, blob, len(blob.encode("utf-8")), now, now)
+            )
+            self._evict()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM verdicts").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # Free a bit more than necessary so we don't evict on every insert
+        target = int(self.max_bytes * 0.9)
+        stale = []
+        for key, size in self._conn.execute("SELECT key, size FROM verdicts ORDER BY last_used ASC"):
+            if total <= target:
+                break
+            stale.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM verdicts WHERE key = ?", stale)
+        self.evictions += len(stale)
+
+    def reset_counters(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        """Counters for the result JSON"""
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM verdicts").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "size_bytes": size,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_judge_cache():
+    """Returns the judge cache configured in config.json, or None if disabled"""
+    config = get_config()
+    if not config.get("judge_cache", True):
+        return None
+    try:
+        return JudgeCache(
+            path=config.get("judge_cache_path") or DEFAULT_CACHE_PATH,
+            max_bytes=int(config.get("judge_cache_max_mb") or DEFAULT_MAX_MB) * 1024 * 1024
+        )
+    except Exception as e:
+        print(f"Judge cache disabled: {e}")
+        return None
@@ -2,9 +2,19 @@ import requests
 import json
 import time
 import os
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 CONFIG_FILE = "config.json"
 
+# HTTP defaults (can be overridden in config.json)
+DEFAULT_CONNECT_TIMEOUT = 5.0     # seconds to establish the TCP connection
+DEFAULT_READ_TIMEOUT = 600.0      # seconds between bytes (long generations on slow hardware)
+DEFAULT_MAX_RETRIES = 3           # retries for connection errors and 502/503/504
+DEFAULT_RETRY_BACKOFF = 0.5       # backoff factor: 0.5s, 1s, 2s, ...
+RETRY_STATUS_CODES = (502, 503, 504)  # Ollama busy or starting, the request never reached the model
+DEFAULT_POOL_SIZE = 4             # keep-alive connections per host
+
 def get_config():
     if os.path.exists(CONFIG_FILE):
         try:
@@ -21,15 +31,60 @@ def save_config(config):
 OLLAMA_API_URL = get_config().get("ollama_api_url", "http://localhost:11434/api")
 
 class OllamaClient:
-    def __init__(self, base_url=None):
+    def __init__(self, base_url=None, connect_timeout=None, read_timeout=None,
+                 max_retries=None, pool_size=None):
+        config = get_config()
         if base_url:
             self.base_url = base_url
         else:
-            self.base_url = get_config().get("ollama_api_url", "http://localhost:11434/api")
+            self.base_url = config.get("ollama_api_url", "http://localhost:11434/api")
+
+        self.connect_timeout = float(connect_timeout or config.get("connect_timeout") or DEFAULT_CONNECT_TIMEOUT)
+        self.read_timeout = float(read_timeout or config.get("read_timeout") or DEFAULT_READ_TIMEOUT)
+        self.timeout = (self.connect_timeout, self.read_timeout)
+
+        if max_retries is None:
+            max_retries = config.get("max_retries", DEFAULT_MAX_RETRIES)
+        self.max_retries = int(max_retries)
+        self.pool_size = int(pool_size or config.get("pool_size") or DEFAULT_POOL_SIZE)
+
+        self.session = self._create_session()
+
+    def _create_session(self):
+        """
+        Pooled keep-alive session. Retries only cover failures where the request
+        never reached the model (connection errors, 502/503/504 while Ollama is
+        busy or starting). Read errors are not retried, a generation that died
+        halfway must not silently be restarted.
+        """
+        retry = Retry(
+            total=self.max_retries,
+            connect=self.max_retries,
+            read=0,
+            status=self.max_retries,
+            backoff_factor=DEFAULT_RETRY_BACKOFF,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=None,  # Ollama uses POST for everything
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
     def list_models(self):
         try:
-            response = requests.get(f"{self.base_url}/tags")
+            response = self.session.get(f"{self.base_url}/tags", timeout=self.timeout)
             response.raise_for_status()
             models = response.json().get('models', [])
             return [m['name'] for m in models]
@@ -37,10 +92,12 @@ class OllamaClient:
             print(f"Error listing models: {e}")
             return []
 
-    def generate(self, model, prompt, system=None, options=None, stream=False):
+    def generate(self, model, prompt, system=None, options=None, stream=False, format=None, context=None):
         """
         Generates text. Returns dict with 'response', 'total_duration', 'eval_count', 'eval_duration' etc.
         If stream=True, yields chunks of the response.
+        format can be "json" or a JSON schema dict to constrain the output.
+        context is the 'context' of a previous response, to continue that conversation.
         """
         url = f"{self.base_url}/generate"
         payload = {
@@ -52,12 +109,16 @@ class OllamaClient:
             payload["system"] = system
         if options:
             payload["options"] = options
+        if format:
+            payload["format"] = format
+        if context:
+            payload["context"] = context
 
         try:
             if stream:
                 return self._generate_stream(url, payload)
             
-            response = requests.post(url, json=payload)
+            response = self.session.post(url, json=payload, timeout=self.timeout)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -65,7 +126,7 @@ class OllamaClient:
 
     def _generate_stream(self, url, payload):
         try:
-            with requests.post(url, json=payload, stream=True) as r:
+            with self.session.post(url, json=payload, stream=True, timeout=self.timeout) as r:
                 r.raise_for_status()
                 for line in r.iter_lines():
                     if line:
@@ -73,6 +134,34 @@ class OllamaClient:
         except Exception as e:
             yield {"error": str(e)}
 
+    def unload_model(self, model_name):
+        """
+        Evicts a model from memory (generate request with keep_alive 0).
+        """
+        url = f"{self.base_url}/generate"
+        payload = {"model": model_name, "keep_alive": 0}
+        try:
+            response = self.session.post(url, json=payload, timeout=self.timeout)
+            response.raise_for_status()
+            return True
+        except Exception as e:
+            print(f"Unload error: {e}")
+            return False
+
+    def get_model_size(self, model_name):
+        """
+        Returns the size of the model files in bytes (from /tags), or None.
+        """
+        try:
+            response = self.session.get(f"{self.base_url}/tags", timeout=self.timeout)
+            response.raise_for_status()
+            for m in response.json().get('models', []):
+                if m.get('name') == model_name or m.get('model') == model_name:
+                    return m.get('size')
+        except Exception as e:
+            print(f"Error reading model size: {e}")
+        return None
+
     def check_model_availability(self, model_name):
         models = self.list_models()
         return model_name in models
@@ -84,7 +173,7 @@ class OllamaClient:
         url = f"{self.base_url}/show"
         payload = {"name": model_name}
         try:
-            response = requests.post(url, json=payload)
+            response = self.session.post(url, json=payload, timeout=self.timeout)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -99,7 +188,7 @@ class OllamaClient:
         payload = {"name": model_name, "stream": True}
         
         try:
-            with requests.post(url, json=payload, stream=True) as r:
+            with self.session.post(url, json=payload, stream=True, timeout=self.timeout) as r:
                 r.raise_for_status()
                 for line in r.iter_lines():
                     if line:
@@ -123,7 +212,7 @@ class OllamaClient:
         url = f"{self.base_url}/delete"
         payload = {"name": model_name}
         try:
-            response = requests.delete(url, json=payload)
+            response = self.session.delete(url, json=payload, timeout=self.timeout)
             return response.status_code == 200
         except Exception as e:
             print(f"Delete error: {e}")
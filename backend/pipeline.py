@@ -0,0 +1,81 @@
+import queue
+import threading
+
+_STOP = object()
+
+class JudgePipeline:
+    """
+    Producer/consumer queue between generation and judging.
+
+    The generation phase calls submit() for every finished answer, a background
+    thread judges it right away with BenchmarkRunner.judge_generated. As soon as
+    all tasks of a category are judged, the category result is compiled and passed
+    to on_category(category_id, result), so scores show up while the test model
+    is still generating.
+
+    Only useful when the test model and the judge model fit into memory together,
+    otherwise Ollama swaps models for every request.
+    """
+
+    def __init__(self, runner, categories, on_task_judged=None, on_category=None):
+        self.runner = runner
+        self.categories = list(categories)
+        self.on_task_judged = on_task_judged
+        self.on_category = on_category
+
+        self.judged = {}            # task_id -> judged result
+        self.category_results = {}  # category_id -> compiled result
+        self._queue = queue.Queue()
+        self._cancelled = False
+        self._thread = threading.Thread(target=self._run, name="JudgePipeline", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def submit(self, task_id, data):
+        """Queues a generated answer ({"response": ..., "metrics": ...} or {"error": ...})"""
+        self._queue.put((task_id, data))
+
+    def cancel(self):
+        """Skips everything that is still queued"""
+        self._cancelled = True
+        self._queue.put(_STOP)
+
+    def join(self):
+        """Waits until all submitted answers are judged and returns the category results"""
+        self._queue.put(_STOP)
+        self._thread.join()
+        return self.category_results
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            if self._cancelled:
+                continue
+
+            task_id, data = item
+            try:
+                res = self.runner.judge_generated(task_id, data)
+            except Exception as e:
+                # Keep the thread alive: the task counts as 0 and the category still gets compiled
+                res = {"id": task_id, "score": 0, "error": str(e), "comment": f"Judge error: {e}", "issues": []}
+            self.judged[task_id] = res
+            if self.on_task_judged:
+                self.on_task_judged(task_id, res)
+
+            self._compile_if_complete(task_id[0])
+
+    def _compile_if_complete(self, category_id):
+        if category_id not in self.categories or category_id in self.category_results:
+            return
+        task_ids = self.runner.get_category_def(category_id).get("tasks", [])
+        if not all(tid in self.judged for tid in task_ids):
+            return
+
+        final_res = self.runner.compile_category_result(category_id, [self.judged[tid] for tid in task_ids])
+        self.category_results[category_id] = final_res
+        if self.on_category:
+            self.on_category(category_id, final_res)
@@ -0,0 +1,161 @@
+"""
+Re-judges stored benchmark results without regenerating the answers.
+
+Only works for result files written with "store_generations": true in
+config.json, because the raw model answers are needed. Usage:
+
+    python -m backend.rejudge results/llmark_*.json
+    python -m backend.rejudge results/ --output-dir results/rejudged
+"""
+
+import os
+import sys
+import json
+import glob
+import copy
+import fnmatch
+import argparse
+import datetime
+
+from .ollama_client import OllamaClient
+from .benchmarks import BenchmarkRunner, JUDGE_MODEL
+from .judge_cache import open_judge_cache
+
+RESULT_FILE_PATTERN = "llmark_*.json"
+
+def rejudge_results(results, runner, progress_callback=None):
+    """
+    Runs only the judge over the stored generations of one result dict and
+    recompiles every category. Returns a new result dict, the input is not modified.
+    Tasks without a stored answer keep their old verdict.
+    """
+    new_results = copy.deepcopy(results)
+    benchmarks = []
+    missing = []
+    total_score = 0
+
+    for bench in new_results.get("benchmarks", []):
+        tasks = bench.get("tasks")
+        if not tasks:
+            # Speed and other measurements are not judged
+            benchmarks.append(bench)
+            continue
+
+        category_id = bench.get("category_id") or bench.get("id")
+        cat_results = []
+        for task in tasks:
+            task_id = task.get("id")
+            if task.get("response") is None:
+                missing.append(task_id)
+                cat_results.append(task)
+                continue
+
+            if progress_callback:
+                progress_callback(f"Judging {task_id}...")
+            data = {"response": task["response"], "metrics": task.get("metrics")}
+            res = runner.judge_generated(task_id, data)
+            # Answers are the input of a re-judge, never drop them
+            res["response"] = task["response"]
+            cat_results.append(res)
+
+        final_res = runner.compile_category_result(category_id, cat_results)
+        benchmarks.append(final_res)
+        total_score += final_res.get("score", 0)
+
+    new_results["benchmarks"] = benchmarks
+    new_results["total_score"] = total_score
+    new_results["rejudged"] = {
+        "date_utc": datetime.datetime.utcnow().isoformat(),
+        "previous_judge_model": results.get("judge_model"),
+        "previous_total_score": results.get("total_score"),
+        "missing_generations": missing,
+    }
+    new_results["judge_model"] = JUDGE_MODEL
+    if runner.judge_cache:
+        new_results["judge_cache"] = runner.judge_cache.stats()
+    return new_results
+
+def rejudge_file(path, runner, output_path=None, progress_callback=None):
+    """Re-judges one result file and writes it next to the original (suffix _rejudged) or to output_path"""
+    with open(path, "r", encoding="utf-8") as f:
+        results = json.load(f)
+    if not isinstance(results, dict) or not isinstance(results.get("benchmarks"), list):
+        raise ValueError("not a result file (no benchmarks list)")
+
+    if runner.judge_cache:
+        runner.judge_cache.reset_counters()
+    new_results = rejudge_results(results, runner, progress_callback=progress_callback)
+
+    if not output_path:
+        root, ext = os.path.splitext(path)
+        output_path = f"{root}_rejudged{ext or '.json'}"
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(new_results, f, indent=2, ensure_ascii=False)
+    return output_path, new_results
+
+def expand_result_paths(paths, progress_callback=None):
+    """
+    Accepts files, directories and glob patterns. A directory only contributes its
+    result files (llmark_*.json, see session.save_results), caches and other JSON are skipped.
+    """
+    files = []
+    for p in paths:
+        if os.path.isdir(p):
+            for f in sorted(glob.glob(os.path.join(p, "*.json"))):
+                if fnmatch.fnmatch(os.path.basename(f), RESULT_FILE_PATTERN):
+                    files.append(f)
+                elif progress_callback:
+                    progress_callback(f"Skipping {f}: not a result file")
+        elif any(ch in p for ch in "*?["):
+            files.extend(sorted(glob.glob(p)))
+        else:
+            files.append(p)
+    # Never re-judge our own output again
+    return [f for f in files if not f.endswith("_rejudged.json")]
+
+def rejudge_files(paths, runner=None, output_dir=None, in_place=False, progress_callback=None):
+    """Re-judges many result files, returns a list of (source, output, new_total_score or error)"""
+    own_runner = runner is None
+    if own_runner:
+        runner = BenchmarkRunner(OllamaClient(), judge_cache=open_judge_cache(), store_generations=True)
+
+    if output_dir and not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    summary = []
+    try:
+        for path in expand_result_paths(paths, progress_callback):
+            if in_place:
+                output_path = path
+            elif output_dir:
+                output_path = os.path.join(output_dir, os.path.basename(path))
+            else:
+                output_path = None
+
+            if progress_callback:
+                progress_callback(f"Re-judging {path}...")
+            try:
+                out, new_results = rejudge_file(path, runner, output_path, progress_callback)
+                summary.append((path, out, new_results.get("total_score")))
+            except Exception as e:
+                summary.append((path, None, f"Error: {e}"))
+    finally:
+        # A runner passed in belongs to the caller, so does its cache
+        if own_runner and runner.judge_cache:
+            runner.judge_cache.close()
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-judge stored LLMark results without regenerating")
+    parser.add_argument("paths", nargs="+", help="Result files, directories or glob patterns")
+    parser.add_argument("--output-dir", help="Write re-judged files here (default: next to source, suffix _rejudged)")
+    parser.add_argument("--in-place", action="store_true", help="Overwrite the source files")
+    args = parser.parse_args(argv)
+
+    summary = rejudge_files(args.paths, output_dir=args.output_dir, in_place=args.in_place, progress_callback=print)
+    for src, out, score in summary:
+        print(f"{src} -> {out}: {score}")
+    return 0 if all(out for _, out, _ in summary) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
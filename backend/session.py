@@ -0,0 +1,576 @@
+"""
+Benchmark orchestration without Qt.
+
+BenchmarkSession runs the complete suite for one model and publishes its
+progress on an EventBus (backend/events.py), so does AutopilotSession, the
+pull/benchmark/upload loop over many models. The same code drives the GUI workers (gui/workers.py) and the headless CLI
+(backend/cli.py).
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+
+from .ollama_client import OllamaClient, get_config
+from .benchmarks import (BenchmarkRunner, JUDGE_MODEL, timing_breakdown, context_length_from_info,
+                         enabled_performance_benchmarks)
+from .pipeline import JudgePipeline
+from .judge_cache import open_judge_cache
+from .stats import StreamTimer
+from .telemetry import get_telemetry_sampler
+from .events import (EventBus, Progress, Log, TaskStarted, Chunk, TaskGenerated, TaskJudged,
+                     CategoryCompiled, RunFinished, ModelStarted, ModelFinished, RunFailed)
+
+CATEGORIES = ["B", "C", "D", "E", "F", "G", "H", "I", "J", "W", "X"]
+RESULTS_DIR = "results"
+
+def new_results(model, hardware_info):
+    """Skeleton of the result JSON"""
+    return {
+        "model": model,
+        "date": hardware_info['date_utc'],
+        "system": hardware_info,
+        "judge_model": JUDGE_MODEL,
+        "benchmark_version": "v2",
+        "json_format_version": "v2",
+        "benchmarks": [],
+        "total_score": 0
+    }
+
+def model_details(client, model, context_window=None):
+    """model_details block of the result JSON; context_window overrides the model's own context length"""
+    # Fetch Model Info (Quantization, Context etc)
+    model_info = client.show_model_info(model)
+    if not isinstance(model_info, dict): model_info = {}
+
+    details = model_info.get("details", {})
+    if not isinstance(details, dict): details = {}
+
+    m_ctx = context_length_from_info(model_info)
+    params = model_info.get("parameters")
+    if not m_ctx and isinstance(params, str):
+        match = re.search(r"num_ctx\s+(\d+)", params)
+        if match:
+            m_ctx = int(match.group(1))
+
+    return {
+        "quantization": details.get("quantization_level"),
+        "context_length": context_window or m_ctx,
+        "parameter_size": details.get("parameter_size"),
+        "family": details.get("family")
+    }
+
+def save_results(results, directory=RESULTS_DIR):
+    """Writes results to <directory>/llmark_<date>.json and returns the path"""
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+
+    timestamp = results['date'].replace(':', '').replace('-', '').replace('.', '_')
+    filename = os.path.join(directory, f"llmark_{timestamp}.json")
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    return filename
+
+def quality_score(results):
+    """Sum of the categories B through X (A and the performance benchmarks are measurements)"""
+    return sum(b.get('score', 0) for b in results['benchmarks']
+               if b.get('id') in CATEGORIES or b.get('category_id') in CATEGORIES)
+
+
+class BenchmarkSession:
+    """
+    Runs the whole suite for one model: A, the enabled performance benchmarks,
+    generation of all tasks (concurrency at once), judging and aggregation.
+    Progress goes to self.events; subscribe before run(). The bus is not closed
+    here, whoever created it closes it (which waits until subscribers are done).
+    """
+
+    def __init__(self, test_model, hardware_info, context_window=None, concurrency=None, pipelined=None, events=None):
+        self.test_model = test_model
+        self.hardware_info = hardware_info
+        self.context_window = context_window
+        config = get_config()
+        # Number of tasks generated at once (should match OLLAMA_NUM_PARALLEL)
+        self.concurrency = max(1, int(concurrency or config.get("generation_concurrency") or 1))
+        # Judge while generating (test model and judge must fit into memory together)
+        self.pipelined = bool(config.get("pipelined_judge", False) if pipelined is None else pipelined)
+        # Optional performance benchmarks (context_sweep, concurrency_benchmark, ...)
+        self.performance_benchmarks = enabled_performance_benchmarks(config)
+        self.client = OllamaClient()
+        self.runner = BenchmarkRunner(self.client, judge_cache=open_judge_cache(),
+                                      store_generations=config.get("store_generations", False))
+        # Shared VRAM sampler, every benchmark and task measures in its own window
+        self.sampler = get_telemetry_sampler()
+        self.events = events or EventBus()
+        self.running = True
+
+    def stop(self):
+        self.running = False
+
+    def on_progress(self, bench_id, message):
+        self.events.publish(Progress(bench_id, message))
+
+    def on_log(self, message):
+        self.events.publish(Log(message))
+
+    def on_result(self, bench_id, result):
+        self.events.publish(CategoryCompiled(bench_id, result))
+
+    def on_task_judged(self, task_id, result):
+        self.events.publish(TaskJudged(task_id, result))
+
+    def run(self):
+        """Runs everything, publishes RunFinished and returns the result JSON (dict)"""
+        try:
+            return self._run()
+        finally:
+            # The judge cache connection lives as long as the session
+            if self.runner.judge_cache:
+                self.runner.judge_cache.close()
+
+    def _run(self):
+        full_results = new_results(self.test_model, self.hardware_info)
+        full_results["model_details"] = model_details(self.client, self.test_model, self.context_window)
+
+        # Set runner options
+        runner_options = {}
+        if self.context_window:
+            runner_options["num_ctx"] = int(self.context_window)
+
+        # 1. Benchmark A: Speed (Remains separate as it measures performance)
+        if self.running:
+            self.on_progress("A", "Messe Geschwindigkeit...")
+            self.on_log("--- STARTE BENCHMARK A (SPEED) ---")
+
+            window = self.sampler.open_window("A")
+
+            res_a = self.runner.run_benchmark("A", self.test_model, options=runner_options, progress_callback=lambda m: self.on_progress("A", m))
+
+            window.stop()
+
+            if "error" not in res_a:
+                self.on_log(f"Antwort erhalten ({res_a.get('comment', '')})")
+
+            avg_vram = window.avg_vram
+
+            # Add VRAM metrics to result
+            if "error" not in res_a:
+                res_a['id'] = "A"
+                res_a['name'] = "Velocity/Speed"
+                res_a['metrics'] = {
+                    "peak_vram_mb": window.peak_vram,
+                    "avg_vram_mb": avg_vram,
+                    "gpu_detected": window.peak_vram > 500,
+                    "vram_stats": window.stats.summary(),
+                    "vram_series": self.sampler.series(window)
+                }
+
+            full_results['benchmarks'].append(res_a)
+            full_results['model_estimated_vram_usage_mb'] = avg_vram
+            self.on_result("A", res_a)
+
+        # 1b. Optional performance benchmarks (L: Context-Sweep, P: Parallel Requests)
+        for bench_id in self.performance_benchmarks:
+            if not self.running: break
+            self.on_progress(bench_id, "Starte Performance-Benchmark...")
+            self.on_log(f"\n--- STARTE BENCHMARK {bench_id} ---")
+            res = self.runner.run_benchmark(bench_id, self.test_model, options=runner_options,
+                                            progress_callback=lambda m, b=bench_id: self.on_progress(b, m),
+                                            monitor_factory=self.sampler.window)
+            self.on_log(f"Ergebnis {bench_id}: {res.get('comment', '')}")
+            full_results['benchmarks'].append(res)
+            self.on_result(bench_id, res)
+
+        # 2. Phase: Generation (B-X) - Batch Execution
+        categories = CATEGORIES
+
+        # Flat list of all subtasks to run
+        all_subtasks = []
+        for cat_id in categories:
+            for i in range(1, 4):
+                all_subtasks.append(f"{cat_id}{i}")
+
+        # Pipelined mode: judge each answer as soon as it is generated
+        pipeline = None
+        if self.pipelined:
+            self.on_log("\n--- PIPELINE-MODUS: Judge bewertet parallel zur Generierung (VRAM-Werte enthalten den Judge) ---")
+            pipeline = JudgePipeline(self.runner, categories,
+                                     on_task_judged=self.on_task_judged,
+                                     on_category=self.on_result)
+            pipeline.start()
+
+        self.on_log(f"\n--- STARTE PHASE 2: BATCH GENERIERUNG ({len(all_subtasks)} Tasks, {self.concurrency} parallel) ---")
+
+        # Key: subtask_id (e.g. "B1")
+        generated_responses = asyncio.run(self._generate_all(all_subtasks, runner_options,
+                                                             on_generated=pipeline.submit if pipeline else None))
+
+        if pipeline:
+            self.on_log("\n--- WARTE AUF JUDGE-PIPELINE ---")
+            if not self.running:
+                pipeline.cancel()
+            category_results = pipeline.join()
+        else:
+            # 3. Phase: Judging (Batch)
+            self.on_log("\n--- STARTE PHASE 3: BATCH BEWERTUNG ---")
+
+            # We process by category to emit results as whole blocks
+            judged_subtasks = {} # Key: subtask_id -> Result Dict
+
+            for task_id in all_subtasks:
+                if not self.running: break
+                self.events.publish(TaskStarted(task_id, "judge"))
+
+                data = generated_responses.get(task_id)
+                if data and "error" not in data:
+                    self.on_log(f"[Task {task_id}] Bewerytung läuft...")
+                judged_subtasks[task_id] = self.runner.judge_generated(task_id, data)
+                self.on_task_judged(task_id, judged_subtasks[task_id])
+
+            category_results = {}
+
+        # 4. Aggregation & Emission
+        self.on_log("\n--- AGGREGATION ---")
+
+        total_score = 0
+        for cat_id in categories:
+             if not self.running: break
+
+             if cat_id in category_results:
+                 # Already compiled and emitted by the pipeline
+                 final_res = category_results[cat_id]
+             elif pipeline:
+                 continue
+             else:
+                 # Collect 3 subtasks
+                 cat_results = []
+                 for i in range(1, 4):
+                     tid = f"{cat_id}{i}"
+                     if tid in judged_subtasks:
+                         cat_results.append(judged_subtasks[tid])
+
+                 # Compile Result
+                 final_res = self.runner.compile_category_result(cat_id, cat_results)
+
+                 # Emit to UI
+                 self.on_result(cat_id, final_res)
+
+             full_results['benchmarks'].append(final_res)
+             total_score += final_res.get('score', 0)
+
+        self.on_log("\n--- ALLE BENCHMARKS ABGESCHLOSSEN ---")
+
+        full_results['total_score'] = total_score
+        if self.runner.judge_cache:
+            full_results['judge_cache'] = self.runner.judge_cache.stats()
+
+        self.events.publish(RunFinished(full_results))
+        return full_results
+
+    async def _generate_all(self, task_ids, options, on_generated=None):
+        """Phase 2: Generiert alle Tasks, maximal self.concurrency gleichzeitig"""
+        results = {}
+        slots = asyncio.Semaphore(self.concurrency)
+        # httpx is only needed for the generation phase
+        from .async_ollama_client import AsyncOllamaClient
+        async with AsyncOllamaClient(max_concurrency=self.concurrency) as aclient:
+            async def run_task(task_id):
+                async with slots:
+                    if not self.running:
+                        return
+                    results[task_id] = await self._generate_task(aclient, task_id, options)
+                    self.events.publish(TaskGenerated(task_id, results[task_id]))
+                    if on_generated:
+                        on_generated(task_id, results[task_id])
+
+            await asyncio.gather(*(run_task(t) for t in task_ids))
+        return results
+
+    async def _generate_task(self, aclient, task_id, options):
+        """Streamt die Antwort für einen Task und misst VRAM nur für diesen Task"""
+        self.events.publish(TaskStarted(task_id, "generate"))
+
+        # Use get_task_def to find prompt
+        cat_id = task_id[0]
+        t_id = task_id[1]
+        task_def = self.runner.get_task_def(cat_id, t_id)
+        if not task_def:
+            self.on_log(f"\n[Task {task_id}] Fehler: Task not found")
+            return {"error": "Task not found"}
+
+        self.on_log(f"\n[Task {task_id}] Prompt: {task_def.get('task_desc', '')}")
+
+        # Record VRAM for each generation (only for the test model, NOT the judge)
+        loop = asyncio.get_running_loop()
+        window = self.sampler.window(task_id)
+        # start()/stop() take a reading right away, which can be slow (PowerShell on Windows)
+        await loop.run_in_executor(None, window.start)
+
+        full_response = ""
+        error = None
+        final_chunk = {}
+        start_t = time.time()
+        timer = StreamTimer()
+        stream_gen = aclient.generate_stream(self.test_model, task_def["prompt"], options=options)
+        try:
+            async for chunk in stream_gen:
+                if not self.running: break
+                if "error" in chunk:
+                    error = chunk["error"]
+                    break
+
+                text = chunk.get("response", "")
+                if text:
+                    timer.mark()
+                full_response += text
+                if text:
+                    self.events.publish(Chunk(task_id, text))
+
+                if chunk.get("done"):
+                    # The final chunk carries Ollama's timing fields
+                    final_chunk = chunk
+                    break
+        except Exception as e:
+            error = str(e)
+        finally:
+            elapsed = time.time() - start_t
+            await stream_gen.aclose()
+            # IMPORTANT: Close the window BEFORE judging to avoid measuring the judge model's VRAM.
+            await loop.run_in_executor(None, window.stop)
+
+        if error:
+            self.on_log(f"\n[Task {task_id}] Fehler beim Streamen: {error}")
+            return {"error": error}
+
+        if self.concurrency > 1:
+            # Parallel streams would interleave in the log, so show the full answer at once
+            self.on_log(f"\n[Task {task_id}] Antwort:\n{full_response}")
+        self.on_log(f"\n[Task {task_id}] Fertig.")
+        return {
+            "response": full_response,
+            "metrics": {
+                "peak_vram_mb": window.peak_vram,
+                "avg_vram_mb": window.avg_vram,
+                "gpu_detected": window.peak_vram > 500,
+                "vram_samples": window.stats.count,
+                **timing_breakdown(final_chunk, elapsed),
+                **timer.summary()
+            }
+        }
+
+
+class AutopilotSession:
+    """
+    Pulls, benchmarks and uploads a list of models one after another.
+
+    Progress goes to self.events like in BenchmarkSession, plus ModelStarted and
+    ModelFinished per model and RunFailed when the session has to stop (the
+    message is also kept in self.error). The bus is closed by whoever created it.
+    upload=False skips the GitHub upload, output_dir additionally saves every result JSON.
+    """
+
+    def __init__(self, token, models, hardware_info, context_window=None, autocleanup=False, pipelined=None,
+                 upload=True, output_dir=None, events=None):
+        self.token = token
+        self.models = models
+        self.hardware_info = hardware_info
+        self.context_window = context_window
+        self.autocleanup = autocleanup
+        if pipelined is None:
+            pipelined = get_config().get("pipelined_judge", False)
+        self.pipelined = bool(pipelined)
+        self.upload = upload
+        self.output_dir = output_dir
+        self.client = OllamaClient()
+        self.events = events or EventBus()
+        self.error = None
+        self.running = True
+
+    def stop(self):
+        self.running = False
+
+    def on_progress(self, task, message, percent=None):
+        self.events.publish(Progress(task, message, percent))
+
+    def on_log(self, message):
+        self.events.publish(Log(message))
+
+    def on_result(self, bench_id, result):
+        self.events.publish(CategoryCompiled(bench_id, result))
+
+    def on_task_judged(self, task_id, result):
+        self.events.publish(TaskJudged(task_id, result))
+
+    def on_error(self, message):
+        self.error = message
+        self.events.publish(RunFailed(message))
+
+    def run(self):
+        """Runs all models, returns {model: result JSON} of the finished ones"""
+        runner = BenchmarkRunner(self.client, judge_cache=open_judge_cache(),
+                                 store_generations=get_config().get("store_generations", False))
+        try:
+            return self._run(runner)
+        finally:
+            if runner.judge_cache:
+                runner.judge_cache.close()
+
+    def _run(self, runner):
+        from .contribution import ContributionManager
+        from .hardware import refresh_hardware_info
+
+        contrib = ContributionManager()
+        finished = {}
+
+        # 1. Ensure Judge is present
+        if not self.client.check_model_availability(JUDGE_MODEL):
+            self.on_progress("Judge", f"Pulling Judge: {JUDGE_MODEL}")
+            self.on_log(f"Pulling Judge: {JUDGE_MODEL}...")
+
+            pull_error = [None]
+            def pull_cb(data):
+                if "error" in data:
+                    pull_error[0] = data["error"]
+                elif "total" in data and data["total"] > 0:
+                    percent = int((data["completed"] / data["total"]) * 100)
+                    self.on_progress("Pulling Judge", f"{percent}%", percent)
+
+            success = self.client.pull_model(JUDGE_MODEL, progress_callback=pull_cb)
+            if not success or pull_error[0]:
+                self.on_error(f"Could not pull judge model {JUDGE_MODEL}: {pull_error[0] or 'Unknown error'}")
+                return finished
+
+        # 2. Run through models once
+        for model in self.models:
+            if not self.running:
+                break
+
+            self.events.publish(ModelStarted(model))
+            self.on_log(f"\n--- Starting automated test for {model} ---")
+
+            # A. Pull Model
+            if not self.client.check_model_availability(model):
+                self.on_log(f"Pulling {model}...")
+
+                model_pull_error = [None]
+                def model_pull_cb(data):
+                    if "error" in data:
+                        model_pull_error[0] = data["error"]
+                    elif "total" in data and data["total"] > 0:
+                        percent = int((data["completed"] / data["total"]) * 100)
+                        self.on_progress(f"Pulling {model}", f"{percent}%", percent)
+
+                success = self.client.pull_model(model, progress_callback=model_pull_cb)
+                if not success or model_pull_error[0]:
+                    self.on_log(f"Failed to pull {model} ({model_pull_error[0] or 'Unknown error'}), skipping to next model...")
+                    continue
+
+            # B. Run Benchmark
+            self.on_log(f"Running benchmark for {model}...")
+            if runner.judge_cache:
+                runner.judge_cache.reset_counters()
+
+            # Refresh timestamp and VRAM usage (the static part does not change between models)
+            current_hw = refresh_hardware_info(self.hardware_info)
+            full_results = new_results(model, current_hw)
+            full_results["model_details"] = model_details(self.client, model, self.context_window)
+
+            runner_options = {}
+            if self.context_window:
+                runner_options["num_ctx"] = int(self.context_window)
+
+            # Benchmark A
+            res_a = runner.run_benchmark("A", model, options=runner_options)
+            res_a['id'] = "A"
+            res_a['name'] = "Velocity/Speed"
+            full_results['benchmarks'].append(res_a)
+            self.on_result("A", res_a)
+
+            for bench_id in enabled_performance_benchmarks(get_config()):
+                if not self.running: break
+                self.on_log(f"Running performance benchmark {bench_id}...")
+                res = runner.run_benchmark(bench_id, model, options=runner_options,
+                                           monitor_factory=get_telemetry_sampler().window)
+                full_results['benchmarks'].append(res)
+                self.on_result(bench_id, res)
+
+            # Benchmarks B-X
+            categories = CATEGORIES
+            all_subtasks = [f"{c}{i}" for c in categories for i in range(1,4)]
+
+            pipeline = None
+            if self.pipelined:
+                pipeline = JudgePipeline(runner, categories, on_task_judged=self.on_task_judged,
+                                         on_category=self.on_result).start()
+
+            gen_responses = {}
+            for tid in all_subtasks:
+                if not self.running: break
+                self.events.publish(TaskStarted(tid, "generate"))
+                start_t = time.time()
+                resp, err = runner.generate_response(tid, model, options=runner_options)
+                elapsed = time.time() - start_t
+                if not err and isinstance(resp, dict) and resp.get("error"):
+                    err = resp["error"]
+                text = resp.get("response") if isinstance(resp, dict) else resp
+                metrics = timing_breakdown(resp, elapsed) if isinstance(resp, dict) else None
+                gen_responses[tid] = {"response": text, "error": err, "metrics": metrics}
+                if pipeline:
+                    pipeline.submit(tid, gen_responses[tid])
+
+            if not self.running:
+                if pipeline:
+                    pipeline.cancel()
+                break
+
+            category_results = pipeline.join() if pipeline else {}
+
+            total_score = 0
+            for cat_id in categories:
+                final_res = category_results.get(cat_id)
+                if final_res is None:
+                    cat_results = []
+                    for i in range(1, 4):
+                        tid = f"{cat_id}{i}"
+                        cat_results.append(runner.judge_generated(tid, gen_responses.get(tid, {})))
+                        self.on_task_judged(tid, cat_results[-1])
+                    final_res = runner.compile_category_result(cat_id, cat_results)
+                    self.on_result(cat_id, final_res)
+                full_results['benchmarks'].append(final_res)
+                total_score += final_res.get('score', 0)
+
+            full_results['total_score'] = total_score
+            if runner.judge_cache:
+                full_results['judge_cache'] = runner.judge_cache.stats()
+            finished[model] = full_results
+
+            if self.output_dir:
+                self.on_log(f"Results saved to {save_results(full_results, self.output_dir)}")
+
+            # C. Upload
+            if self.upload:
+                self.on_log(f"Uploading results for {model}...")
+                try:
+                    pr_url = contrib.upload_authenticated(self.token, full_results)
+                    self.on_log(f"Successfully uploaded! PR: {pr_url}")
+                except Exception as e:
+                    self.on_log(f"Upload failed: {e}")
+            self.events.publish(ModelFinished(model, full_results))
+
+            # D. Cleanup (Laufend)
+            if self.autocleanup:
+                if model != JUDGE_MODEL:
+                    self.on_log(f"Autocleanup: Removing {model}...")
+                    self.client.delete_model(model)
+                else:
+                    self.on_log(f"Skipping cleanup for judge model {model} during run.")
+
+        # Final Cleanup for Judge if requested
+        if self.autocleanup:
+            self.on_log(f"Final Cleanup: Removing {JUDGE_MODEL}...")
+            self.client.delete_model(JUDGE_MODEL)
+
+        self.on_log("\nAll automated tests completed.")
+        return finished
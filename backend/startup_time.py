@@ -0,0 +1,176 @@
+"""
+Import-time benchmark for the desktop app.
+
+Runs `python -X importtime -c "import <module>"` in fresh interpreters and
+reports the median total plus the most expensive modules, so a heavy import
+that sneaks back into the startup path shows up. Usage:
+
+    python -m backend.startup_time
+    python -m backend.startup_time gui.main_window --runs 7 --output results/startup.json
+    python -m backend.startup_time --max-ms 1500    # CI check
+
+Only the target's own import tree is counted: modules the interpreter loads at
+startup anyway (site, encodings, ...) are taken from a `python -c pass` run and
+left out.
+
+Exit code 0 if the median is within the budget (--max-ms, config startup_budget_ms
+or STARTUP_BUDGET_MS), 1 if it is over, 2 if the target cannot be imported,
+3 if the result file cannot be written.
+"""
+
+import os
+import sys
+import json
+import argparse
+import datetime
+import statistics
+import subprocess
+
+from .ollama_client import get_config
+
+DEFAULT_TARGET = "gui.main_window"  # everything app.py loads before the window shows
+DEFAULT_RUNS = 5
+STARTUP_BUDGET_MS = 1500
+TOP_MODULES = 15
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def parse_importtime(stderr):
+    """
+    Parses -X importtime output into (module, self_us, cumulative_us, depth) tuples.
+    Nesting is encoded as indentation of the module name, depth 0 is a top-level import.
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us = int(parts[0])
+            cumulative_us = int(parts[1])
+        except ValueError:
+            continue  # header line
+        name = parts[2].rstrip()
+        stripped = name.lstrip()
+        depth = (len(name) - len(stripped) - 1) // 2
+        entries.append((stripped, self_us, cumulative_us, depth))
+    return entries
+
+def _importtime(code, python=None, cwd=PROJECT_ROOT):
+    proc = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", code],
+        cwd=cwd, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        lines = [l for l in proc.stderr.splitlines() if not l.startswith("import time:")]
+        raise RuntimeError(lines[-1] if lines else f"exit code {proc.returncode}")
+    return parse_importtime(proc.stderr)
+
+def interpreter_modules(python=None, cwd=PROJECT_ROOT):
+    """Modules a bare interpreter imports on its own (python -c pass)"""
+    return {module for module, _, _, _ in _importtime("pass", python, cwd)}
+
+def measure_import(target=DEFAULT_TARGET, python=None, cwd=PROJECT_ROOT, baseline=()):
+    """
+    One fresh interpreter; returns (total_ms, entries) or raises RuntimeError with the import error.
+    Top-level entries listed in baseline (see interpreter_modules) are not part of the total or entries.
+    """
+    entries = []
+    group = []  # -X importtime lists nested imports before the module that triggered them
+    for entry in _importtime(f"import {target}", python, cwd):
+        group.append(entry)
+        module, _, _, depth = entry
+        if depth == 0:
+            if module not in baseline:
+                entries.extend(group)
+            group = []
+    total_us = sum(cumulative for _, _, cumulative, depth in entries if depth == 0)
+    return total_us / 1000.0, entries
+
+def run_startup_benchmark(target=DEFAULT_TARGET, runs=DEFAULT_RUNS, budget_ms=None, progress_callback=None):
+    """Median import time of target over runs fresh interpreters, as a benchmark result"""
+    if budget_ms is None:
+        budget_ms = get_config().get("startup_budget_ms") or STARTUP_BUDGET_MS
+
+    totals = []
+    self_times = {}
+    cumulative_times = {}
+    try:
+        baseline = interpreter_modules()
+        # One unmeasured run so .pyc compilation is not part of the numbers
+        measure_import(target, baseline=baseline)
+        for i in range(runs):
+            if progress_callback:
+                progress_callback(f"Measuring import time (run {i + 1}/{runs})...")
+            total_ms, entries = measure_import(target, baseline=baseline)
+            totals.append(total_ms)
+            for module, self_us, cumulative_us, _ in entries:
+                self_times.setdefault(module, []).append(self_us / 1000.0)
+                cumulative_times.setdefault(module, []).append(cumulative_us / 1000.0)
+    except (RuntimeError, OSError) as e:
+        return {"id": "U", "name": "Startup Imports", "error": str(e), "score": 0,
+                "comment": f"Error: {e}", "details": {"target": target}}
+
+        for module, self_us, cumulative_us, _ in entries:
+            self_times.setdefault(module, []).append(self_us / 1000.0)
+            cumulative_times.setdefault(module, []).append(cumulative_us / 1000.0)
+
+    def top(times):
+        medians = {module: statistics.median(values) for module, values in times.items()}
+        ranked = sorted(medians.items(), key=lambda item: item[1], reverse=True)[:TOP_MODULES]
+        return [{"module": module, "ms": round(ms, 2)} for module, ms in ranked]
+
+    median_ms = round(statistics.median(totals), 1)
+    within = median_ms <= budget_ms
+    return {
+        "id": "U",
+        "name": "Startup Imports",
+        "description": f"Import time of {target} in a fresh interpreter",
+        "unit": "ms",
+        "score": median_ms,
+        "comment": f"{median_ms} ms ({'within' if within else 'over'} budget of {budget_ms} ms)",
+        "details": {
+            "target": target,
+            "runs": runs,
+            "python": sys.version.split()[0],
+            "date_utc": datetime.datetime.utcnow().isoformat(),
+            "samples_ms": [round(t, 1) for t in totals],
+            "budget_ms": budget_ms,
+            "within_budget": within,
+            "modules": len(cumulative_times),
+            "top_cumulative": top(cumulative_times),
+            "top_self": top(self_times),
+        }
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the import time of the LLMark desktop app")
+    parser.add_argument("target", nargs="?", default=DEFAULT_TARGET, help=f"Module to import (default: {DEFAULT_TARGET})")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="Measured runs (fresh interpreter each)")
+    parser.add_argument("--max-ms", "--budget-ms", dest="budget_ms", type=float,
+                        help=f"Exit with 1 above this median (default: config startup_budget_ms or {STARTUP_BUDGET_MS})")
+    parser.add_argument("--output", help="Write the result JSON to this file")
+    args = parser.parse_args(argv)
+
+    result = run_startup_benchmark(args.target, runs=args.runs, budget_ms=args.budget_ms, progress_callback=print)
+    print(result["comment"])
+    for entry in result["details"].get("top_cumulative", []):
+        print(f"  {entry['ms']:>9.2f} ms  {entry['module']}")
+
+    if args.output:
+        try:
+            os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(result, f, indent=2)
+        except OSError as e:
+            # Not a measurement problem, must not look like "over budget"
+            print(f"Could not write {args.output}: {e}")
+            return 3
+    if "error" in result:
+        return 2
+    return 0 if result["details"]["within_budget"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+import math
+import time
+import random
+import statistics
+
+# Upper bounds (ms) of the inter-token latency histogram buckets
+ITL_BUCKETS_MS = (5, 10, 20, 50, 100, 200, 500, 1000)
+
+def percentile(values, pct):
+    """Percentile with linear interpolation (pct 0-100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return float(ordered[0])
+    pos = (len(ordered) - 1) * pct / 100.0
+    lower = math.floor(pos)
+    upper = math.ceil(pos)
+    if lower == upper:
+        return float(ordered[lower])
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (pos - lower)
+
+def bootstrap_ci(values, stat=statistics.mean, confidence=0.95, resamples=2000, seed=0):
+    """
+    Percentile bootstrap confidence interval for stat(values).
+    Seeded, so the same samples always give the same interval.
+    """
+    if not values:
+        return 0.0, 0.0
+    if len(values) == 1:
+        return float(values[0]), float(values[0])
+
+    rng = random.Random(seed)
+    n = len(values)
+    estimates = [stat([values[rng.randrange(n)] for _ in range(n)]) for _ in range(resamples)]
+    alpha = (1.0 - confidence) / 2.0
+    return percentile(estimates, alpha * 100), percentile(estimates, (1.0 - alpha) * 100)
+
+def summarize(values, confidence=0.95, digits=2):
+    """Descriptive statistics plus bootstrap CI of the mean"""
+    if not values:
+        return {"n": 0}
+    ci_low, ci_high = bootstrap_ci(values, confidence=confidence)
+    return {
+        "n": len(values),
+        "mean": round(statistics.mean(values), digits),
+        "median": round(statistics.median(values), digits),
+        "stdev": round(statistics.stdev(values), digits) if len(values) > 1 else 0.0,
+        "min": round(min(values), digits),
+        "max": round(max(values), digits),
+        "p5": round(percentile(values, 5), digits),
+        "p95": round(percentile(values, 95), digits),
+        "ci_low": round(ci_low, digits),
+        "ci_high": round(ci_high, digits),
+        "ci_confidence": confidence,
+    }
+
+def relative_ci_half_width(values, confidence=0.95):
+    """Half width of the bootstrap CI relative to the mean (0.05 = +-5%)"""
+    if len(values) < 2:
+        return float("inf")
+    mean = statistics.mean(values)
+    if not mean:
+        return float("inf")
+    low, high = bootstrap_ci(values, confidence=confidence)
+    return (high - low) / 2.0 / mean
+
+class StreamTimer:
+    """
+    Monotonic timestamps per streamed chunk. Gives time to first token (from
+    request start) and the distribution of inter-token latencies, which shows
+    stalls that an average TPS value hides.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.first = None
+        self.last = None
+        self.gaps = []
+
+    def mark(self):
+        """Call for every chunk that carries generated text"""
+        now = time.perf_counter()
+        if self.first is None:
+            self.first = now
+        else:
+            self.gaps.append(now - self.last)
+        self.last = now
+
+    def summary(self):
+        if self.first is None:
+            return {"ttft_ms": None, "chunks": 0}
+
+        gaps_ms = [g * 1000.0 for g in self.gaps]
+        histogram = {}
+        lower = 0
+        for upper in ITL_BUCKETS_MS:
+            histogram[f"{lower}-{upper}ms"] = sum(1 for g in gaps_ms if lower <= g < upper)
+            lower = upper
+        histogram[f">={lower}ms"] = sum(1 for g in gaps_ms if g >= lower)
+
+        return {
+            "ttft_ms": round((self.first - self.start) * 1000.0, 1),
+            "chunks": len(gaps_ms) + 1,
+            "itl_mean_ms": round(statistics.mean(gaps_ms), 2) if gaps_ms else None,
+            "itl_p50_ms": round(percentile(gaps_ms, 50), 2) if gaps_ms else None,
+            "itl_p90_ms": round(percentile(gaps_ms, 90), 2) if gaps_ms else None,
+            "itl_p99_ms": round(percentile(gaps_ms, 99), 2) if gaps_ms else None,
+            "itl_max_ms": round(max(gaps_ms), 2) if gaps_ms else None,
+            "itl_histogram": histogram,
+        }
+
+class P2Quantile:
+    """
+    Streaming quantile estimate with the P-square algorithm (Jain & Chlamtac):
+    five markers, constant memory, no stored samples. Exact for the first five values.
+    """
+
+    def __init__(self, pct):
+        p = pct / 100.0
+        self.pct = pct
+        self.heights = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x):
+        q = self.heights
+        if len(q) < 5:
+            q.append(x)
+            q.sort()
+            return
+
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(4) if q[i] <= x < q[i + 1])
+
+        n = self.positions
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        # Move the three middle markers towards their desired positions
+        for i in range(1, 4):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                step = 1 if d > 0 else -1
+                parabolic = q[i] + step / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+                if q[i - 1] < parabolic < q[i + 1]:
+                    q[i] = parabolic
+                else:
+                    q[i] = q[i] + step * (q[i + step] - q[i]) / (n[i + step] - n[i])
+                n[i] += step
+
+    def value(self):
+        if len(self.heights) < 5:
+            return percentile(self.heights, self.pct)
+        return self.heights[2]
+
+class RunningStats:
+    """
+    Online statistics in constant memory: Welford mean/variance, min/max and
+    P-square estimates for the percentiles in pcts.
+    """
+
+    def __init__(self, pcts=(50, 90, 99)):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = None
+        self.max = None
+        self.quantiles = {pct: P2Quantile(pct) for pct in pcts}
+
+    def add(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+        self.min = x if self.min is None else min(self.min, x)
+        self.max = x if self.max is None else max(self.max, x)
+        for quantile in self.quantiles.values():
+            quantile.add(x)
+
+    @property
+    def variance(self):
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self):
+        return math.sqrt(self.variance)
+
+    def summary(self, digits=2):
+        if not self.count:
+            return {"n": 0}
+        result = {
+            "n": self.count,
+            "mean": round(self.mean, digits),
+            "stdev": round(self.stdev, digits),
+            "min": round(self.min, digits),
+            "max": round(self.max, digits),
+        }
+        for pct, quantile in self.quantiles.items():
+            result[f"p{pct}"] = round(quantile.value(), digits)
+        return result
@@ -0,0 +1,198 @@
+import time
+import itertools
+import threading
+from collections import deque
+
+from .stats import RunningStats
+
+# Ring buffer size: at least half an hour (TelemetrySampler reads every 0.25 s while measuring)
+DEFAULT_CAPACITY = 7200
+
+class TelemetryBuffer:
+    """
+    Fixed-capacity time series of (timestamp, value) plus running statistics
+    over everything ever added. Memory stays constant however long it runs:
+    the ring buffer drops the oldest samples, the statistics never store any.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.samples = deque(maxlen=capacity)
+        self.stats = RunningStats()
+        self.start = time.time()
+
+    def add(self, value, ts=None):
+        ts = time.time() if ts is None else ts
+        self.samples.append((ts, value))
+        self.stats.add(value)
+
+    def values(self):
+        return [value for _, value in self.samples]
+
+    def series(self, digits=2, since=None, until=None):
+        """
+        Buffered samples as [seconds since start, value] pairs for the result JSON.
+        since/until (timestamps) limit it to a span, offsets are then relative to since.
+        """
+        origin = self.start if since is None else since
+        return [[round(ts - origin, 2), round(value, digits)] for ts, value in list(self.samples)
+                if (since is None or ts >= since) and (until is None or ts <= until)]
+
+    def summary(self, digits=2):
+        return self.stats.summary(digits)
+
+
+class TelemetryWindow:
+    """
+    Named measurement span on a TelemetrySampler. Has a start()/stop()/peak_vram
+    interface, so sampler.window can be passed as monitor_factory.
+    """
+
+    def __init__(self, sampler, name=None):
+        self.sampler = sampler
+        self.name = name or f"window-{next(sampler._window_ids)}"
+        self.stats = RunningStats()
+        self.opened = None
+        self.closed = None
+
+    def start(self):
+        self.sampler._open(self)
+        return self
+
+    def stop(self):
+        self.sampler._close(self)
+        return self.result()
+
+    @property
+    def peak_vram(self):
+        return self.stats.max if self.stats.count else 0.0
+
+    @property
+    def avg_vram(self):
+        return round(self.stats.mean, 2) if self.stats.count else 0
+
+    def result(self):
+        end = self.closed or time.time()
+        return {
+            "peak_vram_mb": self.peak_vram,
+            "avg_vram_mb": self.avg_vram,
+            "samples": self.stats.count,
+            "duration_s": round(end - self.opened, 3) if self.opened else 0.0,
+        }
+
+class TelemetrySampler(threading.Thread):
+    """
+    One long-running VRAM sampler for the whole process, instead of a new monitor
+    thread per task (each with startup jitter, so short tasks got no sample at all).
+
+    Every reading goes into a TelemetryBuffer and into all open windows. Opening
+    and closing a window takes one reading right away, so even a task shorter than
+    the interval is attributed correctly. Listeners get (timestamp, value) for
+    every reading, from the sampler thread.
+
+    Without an open window only the VRAM display listens, so the sampler drops to
+    idle_interval. A slow source (the PowerShell fallback on Windows) would block
+    start()/stop() for the whole reading; then opening a window only wakes the
+    sampler thread and closing it reads only if the window has no reading yet.
+    """
+
+    def __init__(self, interval=0.25, read_func=None, capacity=DEFAULT_CAPACITY, idle_interval=2.0,
+                 slow_read_s=0.05):
+        super().__init__(name="TelemetrySampler", daemon=True)
+        if read_func is None:
+            from .hardware import get_vram_usage_mb
+            read_func = get_vram_usage_mb
+        self.interval = interval
+        self.idle_interval = max(interval, idle_interval)
+        self.slow_read_s = slow_read_s
+        self.last_read_s = 0.0  # duration of the last reading
+        self.read_func = read_func
+        self.telemetry = TelemetryBuffer(capacity)
+        self.listeners = []
+        self._windows = {}
+        self._window_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._wake = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.sample()
+            with self._lock:
+                measuring = bool(self._windows)
+            self._wake.wait(self.interval if measuring else self.idle_interval)
+            self._wake.clear()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake.set()
+        self.join()
+
+    @property
+    def slow(self):
+        return self.last_read_s > self.slow_read_s
+
+    def sample(self):
+        """Takes one reading now and records it"""
+        start = time.perf_counter()
+        try:
+            value = float(self.read_func())
+        except Exception:
+            return None
+        finally:
+            self.last_read_s = time.perf_counter() - start
+        ts = time.time()
+        with self._lock:
+            self.telemetry.add(value, ts)
+            for window in self._windows.values():
+                window.stats.add(value)
+        for listener in list(self.listeners):
+            listener(ts, value)
+        return value
+
+    def window(self, name=None):
+        """Creates a window; it only measures between its start() and stop()"""
+        return TelemetryWindow(self, name)
+
+    def open_window(self, name):
+        return self.window(name).start()
+
+    def close_window(self, name):
+        """Closes the named window and returns peak/avg over exactly its span"""
+        with self._lock:
+            window = self._windows.get(name)
+        if window is None:
+            return None
+        return window.stop()
+
+    def series(self, window, digits=2):
+        """Time series of a (closed) window, offsets relative to its start"""
+        return self.telemetry.series(digits, since=window.opened, until=window.closed)
+
+    def _open(self, window):
+        window.opened = time.time()
+        with self._lock:
+            self._windows[window.name] = window
+        if self.slow:
+            self._wake.set()  # switch to the fast interval, the sampler thread takes the reading
+        else:
+            self.sample()
+
+    def _close(self, window):
+        if not self.slow or not window.stats.count:
+            self.sample()
+        with self._lock:
+            if self._windows.get(window.name) is window:
+                del self._windows[window.name]
+        window.closed = time.time()
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+def get_telemetry_sampler():
+    """Process-wide sampler, started on first use and never stopped"""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = TelemetrySampler()
+            _sampler.start()
+        return _sampler
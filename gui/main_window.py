@@ -9,9 +9,8 @@ from PySide6.QtCore import Qt, Slot, QTimer, QSize
 from PySide6.QtGui import QFont, QColor, QIcon, QPixmap, QPainter, QTextCursor
 
 from backend.ollama_client import OllamaClient
-from backend.hardware import get_hardware_info
-from gui.workers import BenchmarkWorker, PullWorker, HardwareMonitor
-from gui.contribution_dialog import ContributionDialog
+from gui.workers import (BenchmarkWorker, PullWorker, HardwareMonitor, ModelListWorker, JudgeStatusWorker,
+                         HardwareInfoWorker)
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -19,21 +18,34 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("LLMark")
         self.resize(1000, 800)
         
-        self.hardware_info = get_hardware_info()
+        # Filled by background workers, the window shows placeholders until then
+        self.hardware_info = None
         self.client = OllamaClient()
         self.worker = None
         self.pull_worker = None
+        self.hardware_worker = None
+        self.model_list_worker = None
+        self.judge_status_worker = None
+        # Set when a reload is requested while the previous worker is still running
+        self.models_reload_pending = False
+        self.judge_recheck_pending = False
         self.results_data = None
 
         self.setup_ui()
+        self.load_hardware_info()
         self.load_models()
         self.check_judge_status()
         
-        # Background VRAM Monitor (Fixed: No GUI Freeze)
+        # VRAM display, fed by the shared telemetry sampler (no GUI freeze, no second polling loop)
         self.hw_monitor = HardwareMonitor(interval=2.0)
         self.hw_monitor.vram_updated.connect(self.update_vram_display)
         self.hw_monitor.start()
 
+    def closeEvent(self, event):
+        # The sampler keeps running for the process, only detach the display
+        self.hw_monitor.stop()
+        super().closeEvent(event)
+
     def setup_ui(self):
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -211,16 +223,15 @@ class MainWindow(QMainWindow):
         hw_layout = QHBoxLayout()
         hw_layout.setContentsMargins(15, 15, 15, 15)
         
-        cpu_lbl = QLabel(f"<span style='color: #858585;'>CPU:</span> <span style='color: #cccccc;'>{self.hardware_info['cpu']}</span>")
-        ram_lbl = QLabel(f"<span style='color: #858585;'>RAM:</span> <span style='color: #cccccc;'>{self.hardware_info['ram_total_gb']} GB</span>")
-        gpu_lbl = QLabel(f"<span style='color: #858585;'>GPU:</span> <span style='color: #cccccc;'>{self.hardware_info['gpu'] or 'N/A'}</span>")
-        
-        vram_text = f"<span style='color: #858585;'>VRAM:</span> <span style='color: #cccccc;'>{self.hardware_info['vram_total_mb'] or 0} MB</span>"
-        self.vram_lbl = QLabel(vram_text)
+        detecting = "<span style='color: #858585;'>Detecting...</span>"
+        self.cpu_lbl = QLabel(f"<span style='color: #858585;'>CPU:</span> {detecting}")
+        self.ram_lbl = QLabel(f"<span style='color: #858585;'>RAM:</span> {detecting}")
+        self.gpu_lbl = QLabel(f"<span style='color: #858585;'>GPU:</span> {detecting}")
+        self.vram_lbl = QLabel(f"<span style='color: #858585;'>VRAM:</span> {detecting}")
         
-        hw_layout.addWidget(cpu_lbl)
-        hw_layout.addWidget(ram_lbl)
-        hw_layout.addWidget(gpu_lbl)
+        hw_layout.addWidget(self.cpu_lbl)
+        hw_layout.addWidget(self.ram_lbl)
+        hw_layout.addWidget(self.gpu_lbl)
         hw_layout.addWidget(self.vram_lbl)
         hw_group.setLayout(hw_layout)
         main_content_layout.addWidget(hw_group)
@@ -389,7 +400,7 @@ class MainWindow(QMainWindow):
         autocleanup = self.autocleanup_cb.isChecked()
         context_window = config.get("context_window")
         from gui.workers import ContinuousTestWorker
-        self.auto_worker = ContinuousTestWorker(token, models, self.hardware_info, context_window=context_window, autocleanup=autocleanup)
+        self.auto_worker = ContinuousTestWorker(token, models, self.ensure_hardware_info(), context_window=context_window, autocleanup=autocleanup)
         self.auto_worker.status_update.connect(lambda s: self.auto_status_lbl.setText(s))
         self.auto_worker.progress_update.connect(lambda t, p: self.auto_progress.setValue(p))
         self.auto_worker.log_update.connect(lambda l: self.auto_log.append(l))
@@ -492,9 +503,50 @@ class MainWindow(QMainWindow):
         self.progress_group.setLayout(p_layout)
         layout.addWidget(self.progress_group)
 
+    def load_hardware_info(self):
+        self.hardware_worker = HardwareInfoWorker()
+        self.hardware_worker.info_loaded.connect(self.on_hardware_info)
+        self.hardware_worker.start()
+
+    @Slot(dict)
+    def on_hardware_info(self, info):
+        self.hardware_info = info
+        self.cpu_lbl.setText(f"<span style='color: #858585;'>CPU:</span> <span style='color: #cccccc;'>{info['cpu']}</span>")
+        self.ram_lbl.setText(f"<span style='color: #858585;'>RAM:</span> <span style='color: #cccccc;'>{info['ram_total_gb']} GB</span>")
+        self.gpu_lbl.setText(f"<span style='color: #858585;'>GPU:</span> <span style='color: #cccccc;'>{info['gpu'] or 'N/A'}</span>")
+        self.vram_lbl.setText(f"<span style='color: #858585;'>VRAM:</span> <span style='color: #cccccc;'>{info['vram_total_mb'] or 0} MB</span>")
+
+    def ensure_hardware_info(self):
+        """Hardware info for a run; only blocks if the background detection is not done yet"""
+        if self.hardware_info is None:
+            from backend.hardware import get_hardware_info
+            self.on_hardware_info(get_hardware_info())
+        return self.hardware_info
+
     def check_judge_status(self):
+        if self.judge_status_worker and self.judge_status_worker.isRunning():
+            # Replacing a running QThread would let it be garbage collected (Qt aborts), check again afterwards
+            self.judge_recheck_pending = True
+            return
+        self.judge_status_lbl.setText("Checking...")
+        self.judge_status_lbl.setStyleSheet("color: #858585;")
+        self.start_btn.setEnabled(False)
+        self.judge_status_worker = JudgeStatusWorker()
+        self.judge_status_worker.status_checked.connect(self.on_judge_status)
+        self.judge_status_worker.finished.connect(self.on_judge_status_worker_done)
+        self.judge_status_worker.start()
+
+    @Slot()
+    def on_judge_status_worker_done(self):
+        if self.judge_recheck_pending:
+            self.judge_recheck_pending = False
+            self.judge_status_worker.wait()
+            self.check_judge_status()
+
+    @Slot(bool)
+    def on_judge_status(self, available):
         from backend.benchmarks import JUDGE_MODEL
-        if self.client.check_model_availability(JUDGE_MODEL):
+        if available:
             self.judge_status_lbl.setText(f"{JUDGE_MODEL} (Ready)")
             self.judge_status_lbl.setStyleSheet("color: #89d185; font-weight: bold;")
             self.install_judge_btn.setVisible(False)
@@ -608,8 +660,31 @@ class MainWindow(QMainWindow):
         layout.addWidget(self.detail_log_view)
 
     def load_models(self):
+        if self.model_list_worker and self.model_list_worker.isRunning():
+            # Same as check_judge_status: keep the running worker, reload once it is done
+            self.models_reload_pending = True
+            return
         self.model_combo.clear()
-        models = self.client.list_models()
+        self.model_combo.addItem("Loading models...")
+        self.model_combo.setEnabled(False)
+        self.refresh_btn.setEnabled(False)
+        self.model_list_worker = ModelListWorker()
+        self.model_list_worker.models_loaded.connect(self.on_models_loaded)
+        self.model_list_worker.finished.connect(self.on_model_list_worker_done)
+        self.model_list_worker.start()
+
+    @Slot()
+    def on_model_list_worker_done(self):
+        if self.models_reload_pending:
+            self.models_reload_pending = False
+            self.model_list_worker.wait()
+            self.load_models()
+
+    @Slot(list)
+    def on_models_loaded(self, models):
+        self.model_combo.clear()
+        self.model_combo.setEnabled(True)
+        self.refresh_btn.setEnabled(True)
         if models:
             self.model_combo.addItems(models)
         else:
@@ -620,6 +695,8 @@ class MainWindow(QMainWindow):
 
     @Slot(float)
     def update_vram_display(self, used):
+        if self.hardware_info is None:
+            return
         total = self.hardware_info.get('vram_total_mb', 0)
         vram_text = f"<span style='color: #858585;'>VRAM:</span> <span style='color: #cccccc;'>{total} MB (Used: {used} MB)</span>"
         if hasattr(self, 'vram_lbl'):
@@ -627,7 +704,7 @@ class MainWindow(QMainWindow):
 
     def start_benchmark(self):
         test_model = self.model_combo.currentText()
-        if not test_model or "No models" in test_model:
+        if not test_model or "No models" in test_model or not self.model_combo.isEnabled():
             QMessageBox.warning(self, "Error", "No model selected")
             return
             
@@ -646,8 +723,9 @@ class MainWindow(QMainWindow):
         from backend.ollama_client import get_config
         config = get_config()
         context_window = config.get("context_window")
+        concurrency = config.get("generation_concurrency")
         
-        self.worker = BenchmarkWorker(test_model, self.hardware_info, context_window=context_window)
+        self.worker = BenchmarkWorker(test_model, self.ensure_hardware_info(), context_window=context_window, concurrency=concurrency)
         self.worker.progress_update.connect(self.on_progress)
         self.worker.verbose_log.connect(self.on_verbose_log)
         self.worker.stream_chunk.connect(self.on_stream_chunk)
@@ -681,6 +759,10 @@ class MainWindow(QMainWindow):
         
         name_map = {
             "A": "A: Velocity/Speed",
+            "L": "L: Context Scaling",
+            "P": "P: Parallel Throughput",
+            "S": "S: Cold Start",
+            "T": "T: Sustained Load",
             "B": "B: English Quality",
             "C": "C: German Quality",
             "D": "D: Fact Checking",
@@ -703,7 +785,9 @@ class MainWindow(QMainWindow):
             
         comment = result.get('comment', '')
         
-        if bench_id == "A":
+        if result.get('unit'):
+            score_text = f"{result.get('score', 0)} {result['unit']}"
+        elif bench_id == "A":
             score_text = f"{result.get('score', 0)} t/s"
         else:
             score_text = str(result.get('score', 0))
@@ -735,24 +819,17 @@ class MainWindow(QMainWindow):
 
     @Slot(dict)
     def on_all_finished(self, results):
+        from backend.session import save_results, quality_score
         self.results_data = results
         self.start_btn.setEnabled(True)
         self.current_task_lbl.setText("Benchmark Completed")
         self.log("All tasks finished successfully.")
         
         # Calculate sum of categories B through X
-        quality_score = sum(b.get('score', 0) for b in results['benchmarks'] if b.get('id') in list("BCDEFGHIJWX") or b.get('category_id') in list("BCDEFGHIJWX"))
-        self.total_score_lbl.setText(f"Total Quality Score: {round(quality_score, 2)}/110")
-        
-        if not os.path.exists("results"):
-            os.makedirs("results")
-            
-        timestamp = results['date'].replace(':', '').replace('-', '').replace('.', '_')
-        filename = f"results/llmark_{timestamp}.json"
+        self.total_score_lbl.setText(f"Total Quality Score: {round(quality_score(results), 2)}/110")
         
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(results, f, indent=2, ensure_ascii=False)
+            filename = save_results(results)
             self.last_json_path = os.path.abspath(filename)
             self.open_json_btn.setEnabled(True)
             self.log(f"Results saved to {filename}")
@@ -761,6 +838,7 @@ class MainWindow(QMainWindow):
             self.tabs.setCurrentIndex(1) # Switch to results
             
             # Show Contribution Dialog
+            from gui.contribution_dialog import ContributionDialog
             dlg = ContributionDialog(results, self)
             dlg.exec()
             
@@ -796,6 +874,35 @@ class MainWindow(QMainWindow):
         ctx_input.setStyleSheet("background-color: #3c3c3c; border: 1px solid #3e3e42; padding: 5px; color: #cccccc;")
         form_layout.addRow("Context Window:", ctx_input)
         
+        par_input = QLineEdit(str(config.get("generation_concurrency") or ""))
+        par_input.setPlaceholderText("e.g. 4 (match OLLAMA_NUM_PARALLEL, empty = 1)")
+        par_input.setStyleSheet("background-color: #3c3c3c; border: 1px solid #3e3e42; padding: 5px; color: #cccccc;")
+        form_layout.addRow("Parallel Generations:", par_input)
+        
+        pipe_cb = QCheckBox("Judge while generating (test model + judge must fit in VRAM)")
+        pipe_cb.setChecked(bool(config.get("pipelined_judge", False)))
+        form_layout.addRow("Pipelined Judge:", pipe_cb)
+        
+        store_cb = QCheckBox("Store raw answers in result JSON (needed for re-judging)")
+        store_cb.setChecked(bool(config.get("store_generations", False)))
+        form_layout.addRow("Store Generations:", store_cb)
+        
+        sweep_cb = QCheckBox("Context sweep 1k-32k tokens (slow)")
+        sweep_cb.setChecked(bool(config.get("context_sweep", False)))
+        form_layout.addRow("Extra Benchmarks:", sweep_cb)
+        
+        conc_cb = QCheckBox("Parallel requests 1-16 (needs OLLAMA_NUM_PARALLEL)")
+        conc_cb.setChecked(bool(config.get("concurrency_benchmark", False)))
+        form_layout.addRow("", conc_cb)
+        
+        cold_cb = QCheckBox("Cold start (unloads the model between runs)")
+        cold_cb.setChecked(bool(config.get("cold_start_benchmark", False)))
+        form_layout.addRow("", cold_cb)
+        
+        soak_cb = QCheckBox("Sustained load / thermal throttling (5 min by default)")
+        soak_cb.setChecked(bool(config.get("soak_benchmark", False)))
+        form_layout.addRow("", soak_cb)
+        
         dialog_layout.addLayout(form_layout)
         
         buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
@@ -807,6 +914,7 @@ class MainWindow(QMainWindow):
         if dialog.exec() == QDialog.Accepted:
             new_url = url_input.text().strip()
             new_ctx = ctx_input.text().strip()
+            new_par = par_input.text().strip()
             
             if new_url:
                 config["ollama_api_url"] = new_url
@@ -820,6 +928,22 @@ class MainWindow(QMainWindow):
                     return
             else:
                 config["context_window"] = None
+            
+            if new_par:
+                try:
+                    config["generation_concurrency"] = max(1, int(new_par))
+                except ValueError:
+                    QMessageBox.warning(self, "Error", "Parallel Generations must be a number.")
+                    return
+            else:
+                config["generation_concurrency"] = None
+            
+            config["pipelined_judge"] = pipe_cb.isChecked()
+            config["store_generations"] = store_cb.isChecked()
+            config["context_sweep"] = sweep_cb.isChecked()
+            config["concurrency_benchmark"] = conc_cb.isChecked()
+            config["cold_start_benchmark"] = cold_cb.isChecked()
+            config["soak_benchmark"] = soak_cb.isChecked()
                 
             save_config(config)
             QMessageBox.information(self, "Success", "Settings updated.")